@@ -19,7 +19,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from src.core.video_processor import VideoProcessor
+from src.core.video_processor import get_video_processor
 from src.core.vector_store import VectorStore
 from src.analyzers.openai_analyzer import OpenAITimelineAnalyzer
 from src.core.video_trimmer import VideoTrimmer
@@ -42,7 +42,7 @@ app.add_middleware(
 )
 
 # Initialize components
-video_processor = VideoProcessor()
+video_processor = get_video_processor()
 vector_store = VectorStore()
 openai_analyzer = OpenAITimelineAnalyzer()
 video_trimmer = VideoTrimmer()
@@ -23,7 +23,7 @@ def test_imports():
             ("datetime", "from datetime import datetime"),
             ("models", "from models import *"),
             ("vector_store", "from vector_store import VectorStore"),
-            ("video_processor", "from video_processor import VideoProcessor"),
+            ("video_processor", "from video_processor import get_video_processor"),
             ("openai_analyzer", "from openai_analyzer import OpenAITimelineAnalyzer"),
             ("video_trimmer", "from video_trimmer import VideoTrimmer"),
         ]
@@ -92,9 +92,9 @@ def test_specific_functions():
     try:
         # Test video processor
         print("Testing video_processor consolidation...")
-        from video_processor import VideoProcessor
+        from video_processor import get_video_processor
         
-        processor = VideoProcessor()
+        processor = get_video_processor()
         # Test with dummy data
         test_slide_changes = [(10.0, "Scene-001.jpg"), (25.0, "Scene-002.jpg"), (30.0, "Scene-003.jpg")]
         result = processor._consolidate_short_scenes(test_slide_changes)
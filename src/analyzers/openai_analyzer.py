@@ -3,10 +3,27 @@ OpenAI-powered analysis for determining relevant video timelines
 """
 
 import os
+import asyncio
+from collections import defaultdict
 from typing import List, Dict, Tuple
 from openai import OpenAI
 from ..core.models import SearchResult, VideoTimeline
 
+# SearchResult fields that go into the per-scene part of the timeline prompt
+PROMPT_FIELDS = (
+    "scene_number",
+    "start_time_formatted",
+    "end_time_formatted",
+    "transcript",
+    "visual_context",
+    "similarity_score"
+)
+
+
+def _to_columnar(results: List[SearchResult], fields: Tuple[str, ...]) -> Dict[str, list]:
+    """Collect the given SearchResult fields into a dict of parallel per-field lists"""
+    return {field: [getattr(result, field) for result in results] for field in fields}
+
 
 class OpenAITimelineAnalyzer:
     """Uses OpenAI to analyze search results and determine relevant timelines"""
@@ -44,19 +61,25 @@ class OpenAITimelineAnalyzer:
         # Sort scenes by start time
         sorted_scenes = sorted(scenes, key=lambda x: x.start_time)
         
-        # Prepare scene information for OpenAI
-        scene_info = []
-        for scene in sorted_scenes:
-            scene_info.append({
-                "scene_number": scene.scene_number,
-                "start_time": scene.start_time,
-                "end_time": scene.end_time,
-                "start_time_formatted": scene.start_time_formatted,
-                "end_time_formatted": scene.end_time_formatted,
-                "transcript": scene.transcript,
-                "visual_context": scene.visual_context or "",
-                "similarity_score": scene.similarity_score
-            })
+        # Prepare scene information for OpenAI as parallel columns
+        cols = _to_columnar(sorted_scenes, PROMPT_FIELDS)
+        scenes_text = "".join(
+            f"""
+Scene {number} ({start} - {end}):
+Transcript: {transcript}
+Visual Context: {visual_context or ""}
+Similarity Score: {score:.3f}
+
+"""
+            for number, start, end, transcript, visual_context, score in zip(
+                cols["scene_number"],
+                cols["start_time_formatted"],
+                cols["end_time_formatted"],
+                cols["transcript"],
+                cols["visual_context"],
+                cols["similarity_score"]
+            )
+        )
         
         # Create the prompt for OpenAI
         prompt = f"""
@@ -68,15 +91,7 @@ Video Title: "{video_title}"
 Here are the relevant scenes found by semantic search (sorted by start time):
 
 """
-        
-        for i, scene in enumerate(scene_info, 1):
-            prompt += f"""
-Scene {scene['scene_number']} ({scene['start_time_formatted']} - {scene['end_time_formatted']}):
-Transcript: {scene['transcript']}
-Visual Context: {scene['visual_context']}
-Similarity Score: {scene['similarity_score']:.3f}
-
-"""
+        prompt += scenes_text
         
         prompt += f"""
 Based on the search query and these scenes, please:
@@ -98,7 +113,9 @@ Important: Only include the JSON response, no additional text.
 """
         
         try:
-            response = self.client.chat.completions.create(
+            # Run the blocking client call in a thread so per-video analyses can overlap
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model="gpt-4o",
                 messages=[
                     {
@@ -335,26 +352,19 @@ Prioritize complete, coherent explanations over strict individual scene relevanc
         """
         
         # Group results by video_id
-        videos_scenes: Dict[str, List[SearchResult]] = {}
-        video_titles: Dict[str, str] = {}
-        
+        videos_scenes: Dict[str, List[SearchResult]] = defaultdict(list)
         for result in search_results:
-            if result.video_id not in videos_scenes:
-                videos_scenes[result.video_id] = []
-                video_titles[result.video_id] = result.video_title
-            
             videos_scenes[result.video_id].append(result)
         
-        # Analyze timeline for each video
-        video_timelines = []
-        for video_id, scenes in videos_scenes.items():
-            if len(scenes) > 0:  # Only process videos with relevant scenes
-                timeline = await self.analyze_video_timeline(
-                    query=query,
-                    scenes=scenes,
-                    video_id=video_id,
-                    video_title=video_titles[video_id]
-                )
-                video_timelines.append(timeline)
+        # Analyze the timeline for each video concurrently
+        video_timelines = await asyncio.gather(*(
+            self.analyze_video_timeline(
+                query=query,
+                scenes=scenes,
+                video_id=video_id,
+                video_title=scenes[0].video_title
+            )
+            for video_id, scenes in videos_scenes.items()
+        ))
         
-        return video_timelines
\ No newline at end of file
+        return list(video_timelines)
\ No newline at end of file
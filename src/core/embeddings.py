@@ -0,0 +1,18 @@
+"""
+Shared text embedder for scene indexing and search queries
+"""
+
+import functools
+
+from model2vec import StaticModel
+
+# Static (lookup-table) embeddings distilled from a sentence transformer; scenes and queries
+# must be embedded with the same model for their vectors to be comparable
+EMBEDDING_MODEL = "minishlab/potion-base-8M"
+EMBEDDING_DIM = 256
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedder() -> StaticModel:
+    """Load the embedding model once per process"""
+    return StaticModel.from_pretrained(EMBEDDING_MODEL)
@@ -8,10 +8,10 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from opensearchpy import OpenSearch, AsyncOpenSearch
-from sentence_transformers import SentenceTransformer
 from sentence_transformers.util import semantic_search
 import torch
 
+from .embeddings import EMBEDDING_DIM, get_embedder
 from .models import VideoMetadata, SceneData, SearchResult
 
 
@@ -27,7 +27,7 @@ class VectorStore:
         self.use_ssl = os.getenv("OPENSEARCH_USE_SSL", "false").lower() == "true"
         
         # Initialize embedder for search queries
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = get_embedder()
         
         # Index names
         self.videos_index = "video_metadata"
@@ -115,7 +115,7 @@ class VectorStore:
                     "combined_context": {"type": "text"},
                     "embedding": {
                         "type": "dense_vector",
-                        "dims": 384  # all-MiniLM-L6-v2 embedding dimension
+                        "dims": EMBEDDING_DIM
                     },
                     "scene_image_path": {"type": "keyword"}
                 }
@@ -178,7 +178,7 @@ class VectorStore:
         """Search scenes using semantic similarity"""
         
         # Generate query embedding
-        query_embedding = self.embedder.encode(query, convert_to_tensor=True)
+        query_embedding = torch.from_numpy(self.embedder.encode(query))
         
         if self.client:
             # OpenSearch implementation with vector search
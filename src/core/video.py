@@ -1,13 +1,17 @@
 import whisper
 import json
+import hashlib
+import pickle
 import ssl
 from datetime import timedelta
+from functools import cached_property
 from moviepy.editor import VideoFileClip
 import cv2
+import numpy as np
+import torch
 from PIL import Image
-import imagehash
 from sentence_transformers import SentenceTransformer
-from sentence_transformers.util import semantic_search
+import faiss
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage
 from dotenv import load_dotenv
@@ -25,11 +29,12 @@ def encode_image_to_base64(image_path):
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode("utf-8")
 
-# Load Whisper model and transcribe video
-whisper_model = whisper.load_model("base")
-video_path = "test-1.mp4"
-result = whisper_model.transcribe(video_path, word_timestamps=True)
-segments = result['segments']
+# 64-bit perceptual hash (DCT of a 32x32 grayscale frame, 8x8 low frequencies vs. their median)
+def phash(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8]
+    return int.from_bytes(np.packbits(low_freq > np.median(low_freq)).tobytes(), "big")
 
 # Detect slide transitions using perceptual hashing
 def detect_slide_transitions(video_path, threshold=5, output_dir='scene_images'):
@@ -51,14 +56,13 @@ def detect_slide_transitions(video_path, threshold=5, output_dir='scene_images')
             frame_num += 1
             continue
 
-        pil_image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        current_hash = imagehash.phash(pil_image)
+        current_hash = phash(frame)
 
-        if last_hash and abs(current_hash - last_hash) > threshold:
+        if last_hash is not None and (current_hash ^ last_hash).bit_count() > threshold:
             timestamp = frame_num / frame_rate
             filename = f"Scene-{scene_id:03d}.jpg"
             slide_changes.append((timestamp, filename))
-            pil_image.save(os.path.join(output_dir, filename))
+            Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).save(os.path.join(output_dir, filename))
             scene_id += 1
 
         last_hash = current_hash
@@ -81,28 +85,35 @@ def generate_scene_list_from_slides(slide_changes, video_duration):
         scene_list.append((last_timestamp, video_duration))
     return scene_list
 
-video_duration = VideoFileClip(video_path).duration
-slide_changes = detect_slide_transitions(video_path)
-scene_list = generate_scene_list_from_slides(slide_changes, video_duration)
-
-# Create scenes with transcript
-scene_transcripts = []
-for idx, (start, end) in enumerate(scene_list):
-    transcript_text = ""
-    for segment in segments:
-        if segment['start'] < end and segment['end'] > start:
-            transcript_text += segment['text'] + " "
-    image_filename = slide_changes[idx][1] if idx < len(slide_changes) else ""
-    scene_transcripts.append({
-        "scene_id": idx + 1,
-        "start_time": str(timedelta(seconds=int(start))),
-        "end_time": str(timedelta(seconds=int(end))),
-        "transcript": transcript_text.strip(),
-        "scene_image": f"data/scene_images/{image_filename}" if image_filename else "",
-    })
-
-# Initialize GPT-4o LLM
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
+EMBEDDER_MODEL = 'all-MiniLM-L6-v2'
+
+# Backend and precision the embedder runs with on this machine; vectors from different variants don't mix
+def embedder_variant():
+    return "torch-fp16" if torch.cuda.is_available() else "torch-fp32"
+
+# Models load on first use, so a run served from the scene cache never loads Whisper or the LLM client
+class Models:
+    @cached_property
+    def whisper_model(self):
+        return whisper.load_model("base")
+
+    # Half precision on GPU doubles encode throughput; embeddings are cast back to float32 for FAISS
+    @cached_property
+    def embedder(self):
+        if embedder_variant() == "torch-fp16":
+            return SentenceTransformer(
+                EMBEDDER_MODEL,
+                device="cuda",
+                model_kwargs={"torch_dtype": torch.float16}
+            )
+        return SentenceTransformer(EMBEDDER_MODEL, device="cpu")
+
+    # GPT-4o LLM
+    @cached_property
+    def llm(self):
+        return ChatOpenAI(model="gpt-4o", temperature=0)
+
+models = Models()
 
 # Function to call GPT-4o on an image with enhanced focus on text and relationships
 def generate_visual_context(scene):
@@ -123,7 +134,7 @@ Format: "Text: [all text content] | Structure: [relationships and diagrams] | Co
 
 Be concise and focus on searchable, meaningful information."""
 
-        response = llm([
+        response = models.llm([
             HumanMessage(
                 content=[
                     {"type": "text", "text": enhanced_prompt},
@@ -135,26 +146,83 @@ Be concise and focus on searchable, meaningful information."""
     except Exception as e:
         return None
 
-# Parallel visual context generation
-with ThreadPoolExecutor(max_workers=5) as executor:
-    future_to_idx = {executor.submit(generate_visual_context, scene): idx for idx, scene in enumerate(scene_transcripts)}
-    for future in as_completed(future_to_idx):
-        idx = future_to_idx[future]
-        caption = future.result()
-        if caption:
-            scene_transcripts[idx]["combined_context"] = f"{scene_transcripts[idx]['transcript']} | Visual Context: {caption}"
-        else:
-            scene_transcripts[idx]["combined_context"] = scene_transcripts[idx]['transcript']
-
-# Embed scenes and perform semantic search
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-scene_texts = [scene["combined_context"] for scene in scene_transcripts]
-scene_embeddings = embedder.encode(scene_texts, convert_to_tensor=True)
-
+# Run the full pipeline: transcription, slide detection, visual context and scene embedding
+def build_scene_index(video_path):
+    # Transcribe video
+    result = models.whisper_model.transcribe(video_path, word_timestamps=True)
+    segments = result['segments']
+
+    video_duration = VideoFileClip(video_path).duration
+    slide_changes = detect_slide_transitions(video_path)
+    scene_list = generate_scene_list_from_slides(slide_changes, video_duration)
+
+    # Create scenes with transcript
+    scene_transcripts = []
+    for idx, (start, end) in enumerate(scene_list):
+        transcript_text = ""
+        for segment in segments:
+            if segment['start'] < end and segment['end'] > start:
+                transcript_text += segment['text'] + " "
+        image_filename = slide_changes[idx][1] if idx < len(slide_changes) else ""
+        scene_transcripts.append({
+            "scene_id": idx + 1,
+            "start_time": str(timedelta(seconds=int(start))),
+            "end_time": str(timedelta(seconds=int(end))),
+            "transcript": transcript_text.strip(),
+            "scene_image": f"data/scene_images/{image_filename}" if image_filename else "",
+        })
+
+    # Parallel visual context generation
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        future_to_idx = {executor.submit(generate_visual_context, scene): idx for idx, scene in enumerate(scene_transcripts)}
+        for future in as_completed(future_to_idx):
+            idx = future_to_idx[future]
+            caption = future.result()
+            if caption:
+                scene_transcripts[idx]["combined_context"] = f"{scene_transcripts[idx]['transcript']} | Visual Context: {caption}"
+            else:
+                scene_transcripts[idx]["combined_context"] = scene_transcripts[idx]['transcript']
+
+    scene_texts = [scene["combined_context"] for scene in scene_transcripts]
+    scene_embeddings = models.embedder.encode(scene_texts, convert_to_numpy=True).astype(np.float32)
+
+    # Inner product over L2-normalized vectors is cosine similarity
+    faiss.normalize_L2(scene_embeddings)
+    index = faiss.IndexFlatIP(scene_embeddings.shape[1])
+    index.add(scene_embeddings)
+    return scene_transcripts, index
+
+# Scenes and index are persisted per video; the key changes whenever the file is modified or the
+# embedder that produced the index differs from the one that will embed the query
+CACHE_DIR = "cache"
+video_path = "test-1.mp4"
+cache_key = hashlib.sha256(
+    f"{video_path}:{os.path.getmtime(video_path)}:{EMBEDDER_MODEL}:{embedder_variant()}".encode("utf-8")
+).hexdigest()
+scenes_cache_path = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
+index_cache_path = os.path.join(CACHE_DIR, f"{cache_key}.faiss")
+
+if os.path.exists(scenes_cache_path) and os.path.exists(index_cache_path):
+    with open(scenes_cache_path, "rb") as cache_file:
+        scene_transcripts = pickle.load(cache_file)
+    index = faiss.read_index(index_cache_path)
+else:
+    scene_transcripts, index = build_scene_index(video_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(scenes_cache_path, "wb") as cache_file:
+        pickle.dump(scene_transcripts, cache_file)
+    faiss.write_index(index, index_cache_path)
+
+# Only CPU indexes can be written to disk, so the GPU copy is made after persisting
+if faiss.get_num_gpus() > 0:
+    index = faiss.index_cpu_to_all_gpus(index)
+
+# Embed the query and perform semantic search
 query = "Scene explaining the architecture"
-query_embedding = embedder.encode(query, convert_to_tensor=True)
-hits = semantic_search(query_embedding, scene_embeddings, top_k=3)
+query_embedding = models.embedder.encode([query], convert_to_numpy=True).astype(np.float32)
+faiss.normalize_L2(query_embedding)
+scores, corpus_ids = index.search(query_embedding, min(3, index.ntotal))
 
-top_scenes = [scene_transcripts[hit['corpus_id']] for hit in hits[0]]
+top_scenes = [scene_transcripts[corpus_id] for corpus_id in corpus_ids[0]]
 
 print(top_scenes)
@@ -4,22 +4,31 @@ Video processing module for extracting transcripts, scenes, and visual context
 
 import os
 import ssl
+import asyncio
 import uuid
 import base64
+import hashlib
+import heapq
+import functools
+import multiprocessing
+import subprocess
+import tempfile
+import queue
+import threading
 from datetime import timedelta
-from typing import List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import repeat
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
 
-import whisper
+import ctranslate2
+from faster_whisper import WhisperModel
 import cv2
-from PIL import Image
-import imagehash
-from moviepy.editor import VideoFileClip
-from sentence_transformers import SentenceTransformer
+import numpy as np
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage
 from dotenv import load_dotenv
 
+from .embeddings import get_embedder
 from .models import SceneData
 
 # Load environment variables
@@ -29,14 +38,191 @@ load_dotenv()
 ssl._create_default_https_context = ssl._create_unverified_context
 
 
+# pHash: DCT of a 32x32 grayscale image, keeping the 8x8 lowest frequencies as a 64-bit hash
+PHASH_SIZE = 32
+PHASH_LOW_FREQ = 8
+
+
+def _phash(frame) -> int:
+    """Perceptual hash of a BGR frame as a 64-bit int, computed directly with OpenCV"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (PHASH_SIZE, PHASH_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:PHASH_LOW_FREQ, :PHASH_LOW_FREQ]
+    bits = np.packbits(low_freq > np.median(low_freq))
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def _hash_distance(a: int, b: int) -> int:
+    """Hamming distance between two 64-bit hashes"""
+    return (a ^ b).bit_count()
+
+
+# Seeking restarts decoding at the previous keyframe, so it only beats decoding straight through
+# when samples are further apart than a typical keyframe interval
+SEEK_MIN_STEP = 120
+
+
+def _iter_sampled_frames(cap, start_frame: int, end_frame: Optional[int], step: int):
+    """Yield (timestamp, frame) for every step-th frame in [start_frame, end_frame); end_frame=None reads to the end"""
+    frame_rate = cap.get(cv2.CAP_PROP_FPS)
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    frame_num = start_frame
+
+    if step >= SEEK_MIN_STEP:
+        # Sparse sampling: jump straight to each sampled frame instead of decoding the gap
+        while end_frame is None or frame_num < end_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame_num / frame_rate, frame
+            frame_num += step
+        return
+
+    while end_frame is None or frame_num < end_frame:
+        # grab() advances without converting the frame; only sampled frames are retrieved
+        if not cap.grab():
+            return
+
+        if frame_num % step == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                return
+            yield frame_num / frame_rate, frame
+
+        frame_num += 1
+
+
+def _sample_frame_hashes(video_path: str, start_frame: int, end_frame: Optional[int], step: int) -> List[Tuple[float, int]]:
+    """Hash every step-th frame of video in [start_frame, end_frame); end_frame=None reads to the end"""
+    cap = cv2.VideoCapture(video_path)
+    samples = [(timestamp, _phash(frame)) for timestamp, frame in _iter_sampled_frames(cap, start_frame, end_frame, step)]
+    cap.release()
+    return samples
+
+
+def _is_transition(hashes: List[int], i: int, threshold: int) -> bool:
+    """Whether the change into hashes[i] is a sustained transition rather than noise"""
+    hash_diff = _hash_distance(hashes[i], hashes[i-1])
+
+    # Check if this is a significant transition
+    if hash_diff <= threshold:
+        return False
+
+    # Temporal validation: check surrounding frames to confirm transition
+    is_real_transition = True
+
+    # Look ahead and behind to confirm this is a stable transition
+    if i > 1 and i < len(hashes) - 1:
+        # Check if the change is sustained (not just a blip)
+        prev_prev_diff = _hash_distance(hashes[i-1], hashes[i-2])
+        next_diff = _hash_distance(hashes[i+1], hashes[i])
+
+        # If previous frames were stable and next frame is also different, it's a real transition
+        if prev_prev_diff <= threshold and next_diff <= threshold:
+            is_real_transition = True
+        elif prev_prev_diff > threshold:
+            # Too many rapid changes - might be animation/noise
+            is_real_transition = False
+
+    return is_real_transition
+
+
+def _transition_indices(hashes: List[int], threshold: int) -> List[int]:
+    """Indices i where _is_transition(hashes, i, threshold) holds, computed over all hashes at once"""
+    # dists[k] is the distance from hashes[k] to hashes[k+1]
+    dists = np.bitwise_count(np.bitwise_xor(np.array(hashes[1:], dtype=np.uint64), np.array(hashes[:-1], dtype=np.uint64)))
+    k = np.arange(len(dists))
+
+    # A change after another change is animation/noise, unless it is the first or last change
+    prev_dists = np.concatenate(([0], dists[:-1]))
+    noisy = (k >= 1) & (k < len(dists) - 1) & (prev_dists > threshold)
+
+    return (np.flatnonzero((dists > threshold) & ~noisy) + 1).tolist()
+
+
+# Frames buffered between pipeline stages; bounds memory while letting decode run ahead of hashing
+PIPELINE_QUEUE_SIZE = 16
+# Seconds a blocked queue put waits before re-checking whether the pipeline has stopped
+PIPELINE_PUT_TIMEOUT = 0.1
+SCENE_JPEG_QUALITY = 85
+
+
+def _write_jpeg(path: str, frame) -> None:
+    """Encode a BGR frame as JPEG and write the bytes to path"""
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, SCENE_JPEG_QUALITY])
+    if not ok:
+        raise ValueError(f"Could not encode scene frame for {path}")
+    with open(path, "wb") as image_file:
+        image_file.write(buffer.tobytes())
+
+
+VISUAL_CONTEXT_MODEL = "gpt-4o"
+
+# Concurrent GPT-4o visual-context requests per video
+VISUAL_CONTEXT_CONCURRENCY = 20
+
+# GPT-4o downsamples large images anyway; 1024px on the long side keeps slide text legible
+VISUAL_CONTEXT_MAX_SIDE = 1024
+VISUAL_CONTEXT_JPEG_QUALITY = 75
+
+# GPT-4o answers keyed by the sha256 of the encoded image sent with the request
+VISUAL_CONTEXT_CACHE_DIR = "data/visual_context_cache"
+
+
+def _probe_duration(video_path: str) -> float:
+    """Video duration in seconds from the container header via ffprobe, falling back to OpenCV frame metadata"""
+    try:
+        output = subprocess.check_output(
+            [
+                'ffprobe',
+                '-v', 'error',
+                '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1',
+                video_path
+            ],
+            text=True
+        )
+        return float(output)
+    except (FileNotFoundError, subprocess.CalledProcessError, ValueError):
+        cap = cv2.VideoCapture(video_path)
+        frame_rate = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        cap.release()
+        return total_frames / frame_rate if frame_rate > 0 else 0.0
+
+
+def _select_whisper_backend() -> Tuple[str, str]:
+    """
+    Pick the CTranslate2 device and compute type for Whisper
+
+    WHISPER_DEVICE=cuda|cpu overrides auto-detection; GPUs run float16, CPUs run int8 quantized
+    """
+    device = os.getenv("WHISPER_DEVICE", "auto").lower()
+    if device == "auto":
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    return device, "float16" if device == "cuda" else "int8"
+
+
 class VideoProcessor:
     """Video processing class for extracting content and generating embeddings"""
     
     def __init__(self):
         # Initialize models
-        self.whisper_model = whisper.load_model("base")
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
+        whisper_device, whisper_compute_type = _select_whisper_backend()
+        self.whisper_model = WhisperModel(
+            "base",
+            device=whisper_device,
+            compute_type=whisper_compute_type,
+            # CTranslate2 otherwise caps CPU inference at 4 threads
+            cpu_threads=(os.cpu_count() or 0) if whisper_device == "cpu" else 0
+        )
+        self.embedder = get_embedder()
+        self.llm = ChatOpenAI(model=VISUAL_CONTEXT_MODEL, temperature=0)
+        # Scene frame encodes and writes, kept off the frame-decoding loop
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scene-writer")
     
     async def process_video(self, video_path: str, video_id: str) -> List[SceneData]:
         """
@@ -56,12 +242,11 @@ class VideoProcessor:
         
         # Step 1: Transcribe audio
         print(f"Transcribing video: {video_path}")
-        result = self.whisper_model.transcribe(video_path, word_timestamps=True)
-        segments = result['segments']
+        segments = self._transcribe(video_path)
         
         # Step 2: Detect scene transitions
         print("Detecting scene transitions...")
-        video_duration = VideoFileClip(video_path).duration
+        video_duration = _probe_duration(video_path)
         slide_changes = self._detect_slide_transitions(video_path, output_dir)
         scene_list = self._generate_scene_list_from_slides(slide_changes, video_duration)
         
@@ -82,89 +267,206 @@ class VideoProcessor:
         print(f"Processed {len(scenes_with_embeddings)} scenes")
         return scenes_with_embeddings
     
-    def _detect_slide_transitions(self, video_path: str, output_dir: str, threshold: int = 6) -> List[Tuple[float, str]]:
-        """Detect slide transitions using improved perceptual hashing with temporal smoothing"""
+    def _transcribe(self, video_path: str) -> List[dict]:
+        """Transcribe a video into [{start, end, text}] segments, independent of the Whisper backend"""
+        segments_iter, _ = self.whisper_model.transcribe(video_path, vad_filter=True)
+        return [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments_iter
+        ]
+    
+    def _detect_slide_transitions(
+        self,
+        video_path: str,
+        output_dir: str,
+        threshold: int = 6,
+        workers: int = 1,
+        sample_interval: float = 1.0
+    ) -> List[Tuple[float, str]]:
+        """
+        Detect slide transitions using improved perceptual hashing with temporal smoothing
+
+        Args:
+            video_path: Path to the video file
+            output_dir: Directory to save the first frame of each scene
+            threshold: Minimum hash difference that counts as a transition
+            workers: Number of processes used to hash frames (1 = in-process)
+            sample_interval: Seconds between hashed frames; sparse intervals seek instead of decoding every frame
+
+        Returns:
+            List of (timestamp, image filename) tuples, one per scene
+        """
         cap = cv2.VideoCapture(video_path)
         frame_rate = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Collect hashes for temporal smoothing
-        timestamps = []
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        step = max(1, int(frame_rate * sample_interval))
+        if workers <= 1:
+            slide_changes = self._pipelined_transitions(video_path, output_dir, step, threshold)
+        else:
+            slide_changes = self._windowed_transitions(video_path, output_dir, step, total_frames, workers, threshold)
+
+        # Post-process to merge very short scenes (likely false positives)
+        return self._consolidate_short_scenes(slide_changes)
+
+    def _pipelined_transitions(self, video_path: str, output_dir: str, step: int, threshold: int) -> List[Tuple[float, str]]:
+        """Detect transitions with decode, hash and JPEG writes overlapped across a reader thread and the I/O pool"""
+        read_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+        reader_errors = []
+
+        def put(item) -> bool:
+            # Give up once hashing has stopped instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    read_q.put(item, timeout=PIPELINE_PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_frames():
+            cap = cv2.VideoCapture(video_path)
+            try:
+                for sample in _iter_sampled_frames(cap, 0, None, step):
+                    if not put(sample):
+                        return
+            except Exception as e:
+                reader_errors.append(e)
+            finally:
+                cap.release()
+                put(None)
+
+        reader = threading.Thread(target=read_frames, name="slide-reader", daemon=True)
+        reader.start()
+
+        slide_changes = []
+        scene_id = 1
         hashes = []
-        frame_num = 0
+        writes = []
+        # The transition check looks one sample ahead, so each frame waits here until the next arrives
+        pending = None
 
+        def emit(i, timestamp, frame):
+            nonlocal scene_id
+            if i > 0 and _is_transition(hashes, i, threshold):
+                filename = f"Scene-{scene_id:03d}.jpg"
+                slide_changes.append((timestamp, filename))
+                # Bound the frames held by in-flight writes; result() also surfaces write errors early
+                if len(writes) >= PIPELINE_QUEUE_SIZE:
+                    writes.pop(0).result()
+                writes.append(self._io_pool.submit(_write_jpeg, os.path.join(output_dir, filename), frame))
+                scene_id += 1
 
+        try:
+            # Hashing stays on this thread so transition state is updated in frame order
+            while (sample := read_q.get()) is not None:
+                timestamp, frame = sample
+                hashes.append(_phash(frame))
+                if pending is not None:
+                    emit(len(hashes) - 2, *pending)
+                pending = (timestamp, frame)
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+            if pending is not None and len(hashes) >= 2:
+                emit(len(hashes) - 1, *pending)
+        finally:
+            stop.set()
+            # Free any frames the reader queued but hashing never consumed
+            while True:
+                try:
+                    read_q.get_nowait()
+                except queue.Empty:
+                    break
+            reader.join()
+            wait(writes)
 
-            # Process every second of video
-            if frame_num % int(frame_rate) == 0:
-                timestamp = frame_num / frame_rate
-                pil_image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                current_hash = imagehash.phash(pil_image)
-                
-                timestamps.append(timestamp)
-                hashes.append(current_hash)
+        if reader_errors:
+            raise reader_errors[0]
+        for write in writes:
+            write.result()
 
-            frame_num += 1
+        return slide_changes
+
+    def _windowed_transitions(
+        self,
+        video_path: str,
+        output_dir: str,
+        step: int,
+        total_frames: int,
+        workers: int,
+        threshold: int
+    ) -> List[Tuple[float, str]]:
+        """Detect transitions from hashes computed across worker processes, then save each transition frame"""
+        # Collect hashes for temporal smoothing
+        samples = self._sample_hashes(video_path, step, total_frames, workers)
+        timestamps = [timestamp for timestamp, _ in samples]
+        hashes = [frame_hash for _, frame_hash in samples]
 
-        cap.release()
-        
-        # Now detect transitions with improved logic
         slide_changes = []
         scene_id = 1
-        
+
         if len(hashes) < 2:
             return slide_changes
-        
-        # Use temporal smoothing to reduce false positives
-        for i in range(1, len(hashes)):
-            current_hash = hashes[i]
-            prev_hash = hashes[i-1]
+
+        cap = cv2.VideoCapture(video_path)
+        frame_rate = cap.get(cv2.CAP_PROP_FPS)
+        writes = []
+        for i in _transition_indices(hashes, threshold):
             timestamp = timestamps[i]
-            
-            hash_diff = abs(current_hash - prev_hash)
-            
-            # Check if this is a significant transition
-            if hash_diff > threshold:
-                # Temporal validation: check surrounding frames to confirm transition
-                is_real_transition = True
-                
-                # Look ahead and behind to confirm this is a stable transition
-                if i > 1 and i < len(hashes) - 1:
-                    # Check if the change is sustained (not just a blip)
-                    prev_prev_diff = abs(hashes[i-1] - hashes[i-2]) if i > 1 else 0
-                    next_diff = abs(hashes[i+1] - current_hash) if i < len(hashes) - 1 else 0
-                    
-                    # If previous frames were stable and next frame is also different, it's a real transition
-                    if prev_prev_diff <= threshold and next_diff <= threshold:
-                        is_real_transition = True
-                    elif prev_prev_diff > threshold:
-                        # Too many rapid changes - might be animation/noise
-                        is_real_transition = False
-                
-                if is_real_transition:
-                    filename = f"Scene-{scene_id:03d}.jpg"
-                    slide_changes.append((timestamp, filename))
-                    
-                    # Save the frame
-                    cap2 = cv2.VideoCapture(video_path)
-                    cap2.set(cv2.CAP_PROP_POS_FRAMES, timestamp * frame_rate)
-                    ret, frame = cap2.read()
-                    if ret:
-                        pil_image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                        pil_image.save(os.path.join(output_dir, filename))
-                    cap2.release()
-                    
-                    scene_id += 1
-                    
+            filename = f"Scene-{scene_id:03d}.jpg"
+            slide_changes.append((timestamp, filename))
 
+            # Save the frame; encoding and the disk write run on the I/O pool while the next frame is decoded
+            cap.set(cv2.CAP_PROP_POS_FRAMES, round(timestamp * frame_rate))
+            ret, frame = cap.read()
+            if ret:
+                writes.append(self._io_pool.submit(_write_jpeg, os.path.join(output_dir, filename), frame))
+
+            scene_id += 1
+
+        cap.release()
+        for write in writes:
+            write.result()
+        return slide_changes
+
+    def _sample_hashes(self, video_path: str, step: int, total_frames: int, workers: int) -> List[Tuple[float, int]]:
+        """Hash sampled frames, fanning contiguous frame windows out to worker processes"""
+        windows = self._split_frame_windows(step, total_frames, workers)
+        if len(windows) == 1:
+            return _sample_frame_hashes(video_path, *windows[0], step)
+
+        # Spawn rather than fork so workers don't inherit the loaded models
+        starts, ends = zip(*windows)
+        with ProcessPoolExecutor(max_workers=len(windows), mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_sample_frame_hashes, repeat(video_path), starts, ends, repeat(step)))
+
+        # Each window is already sorted; merge lazily and drop any sample a window repeated
+        samples = []
+        for timestamp, frame_hash in heapq.merge(*results, key=lambda sample: sample[0]):
+            if not samples or timestamp > samples[-1][0]:
+                samples.append((timestamp, frame_hash))
+
+        return samples
+
+    def _split_frame_windows(self, step: int, total_frames: int, workers: int) -> List[Tuple[int, Optional[int]]]:
+        """Split the video into contiguous frame windows whose boundaries fall on sampled frames"""
+        total_samples = -(-total_frames // step) if step > 0 else 0
+        workers = max(1, min(workers, total_samples))
+        samples_per_window = -(-total_samples // workers) if total_samples else 0
+
+        if workers == 1 or samples_per_window == 0:
+            return [(0, None)]
+
+        boundaries = list(range(0, total_samples, samples_per_window))
+        windows = []
+        for i, first_sample in enumerate(boundaries):
+            # The last window reads to the end in case the container under-reports its frame count
+            end = boundaries[i + 1] * step if i + 1 < len(boundaries) else None
+            windows.append((first_sample * step, end))
+
+        return windows
 
-        # Post-process to merge very short scenes (likely false positives)
-        return self._consolidate_short_scenes(slide_changes)
-    
     def _consolidate_short_scenes(self, slide_changes: List[Tuple[float, str]], min_scene_duration: float = 3.0) -> List[Tuple[float, str]]:
         """Consolidate only extremely short scenes that are definitely false detections"""
         if len(slide_changes) < 2:
@@ -217,14 +519,23 @@ class VideoProcessor:
     ) -> List[SceneData]:
         """Create scene data with transcripts"""
         scene_transcripts = []
+        # Scenes and segments are both time-ordered, so a single pointer sweeps the segments once
+        segments = sorted(segments, key=lambda segment: segment['start'])
+        seg_idx = 0
         
         for idx, (start, end) in enumerate(scene_list):
-            transcript_text = ""
-            
+            # Skip segments that finished before this scene starts
+            while seg_idx < len(segments) and segments[seg_idx]['end'] <= start:
+                seg_idx += 1
+
             # Extract transcript for this scene timeframe
-            for segment in segments:
-                if segment['start'] < end and segment['end'] > start:
-                    transcript_text += segment['text'] + " "
+            parts = []
+            j = seg_idx
+            while j < len(segments) and segments[j]['start'] < end:
+                if segments[j]['end'] > start:
+                    parts.append(segments[j]['text'])
+                j += 1
+            transcript_text = " ".join(parts)
             
             # Get scene image path
             image_filename = slide_changes[idx][1] if idx < len(slide_changes) else ""
@@ -247,19 +558,25 @@ class VideoProcessor:
         
         return scene_transcripts
     
-    def _encode_image_to_base64(self, image_path: str) -> str:
-        """Encode image to base64 for API calls"""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+    def _encode_scene_image(self, image_path: str) -> bytes:
+        """Encode image as JPEG for API calls, downscaled and recompressed to keep payloads small"""
+        image = cv2.imread(image_path)
+        height, width = image.shape[:2]
+        scale = VISUAL_CONTEXT_MAX_SIDE / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, VISUAL_CONTEXT_JPEG_QUALITY])
+        if not ok:
+            raise ValueError(f"Could not encode image {image_path}")
+        return buffer.tobytes()
     
-    def _generate_visual_context_for_scene(self, scene: SceneData) -> str:
+    async def _generate_visual_context_for_scene(self, scene: SceneData, semaphore: asyncio.Semaphore) -> str:
         """Generate visual context for a single scene using GPT-4o, focusing on text and relationships"""
         if not scene.scene_image_path or not os.path.exists(scene.scene_image_path):
             return None
 
         try:
-            base64_image = self._encode_image_to_base64(scene.scene_image_path)
-            
             enhanced_prompt = """Analyze this image and focus ONLY on the meaningful content, ignoring decorative elements and backgrounds. Provide:
 
 1. TEXT CONTENT: Extract and list all visible text, headings, labels, and captions
@@ -271,36 +588,73 @@ Format: "Text: [all text content] | Structure: [relationships and diagrams] | Co
 
 Be concise and focus on searchable, meaningful information."""
 
-            response = self.llm([
-                HumanMessage(
-                    content=[
-                        {"type": "text", "text": enhanced_prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
-                    ]
-                )
-            ])
-            return response.content.strip()
+            image_bytes = self._encode_scene_image(scene.scene_image_path)
+
+            # Identical slides (re-processed videos, shared intro/outline slides) reuse the earlier answer;
+            # the model and prompt are part of the key so changing either invalidates old answers
+            cache_key = hashlib.sha256()
+            for part in (VISUAL_CONTEXT_MODEL.encode("utf-8"), enhanced_prompt.encode("utf-8"), image_bytes):
+                cache_key.update(hashlib.sha256(part).digest())
+            cache_path = os.path.join(VISUAL_CONTEXT_CACHE_DIR, f"{cache_key.hexdigest()}.txt")
+            if os.path.exists(cache_path):
+                with open(cache_path, "r", encoding="utf-8") as cache_file:
+                    return cache_file.read()
+
+            base64_image = base64.b64encode(image_bytes).decode("utf-8")
+
+            async with semaphore:
+                response = await self.llm.ainvoke([
+                    HumanMessage(
+                        content=[
+                            {"type": "text", "text": enhanced_prompt},
+                            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+                        ]
+                    )
+                ])
+            visual_context = response.content.strip()
         except Exception as e:
             print(f"Failed to generate visual context for scene {scene.scene_id}: {str(e)}")
             return None
+
+        # A cache failure must not throw away an answer that was already paid for
+        try:
+            self._write_visual_context_cache(cache_path, visual_context)
+        except OSError as e:
+            print(f"Failed to cache visual context for scene {scene.scene_id}: {str(e)}")
+
+        return visual_context
+
+    def _write_visual_context_cache(self, cache_path: str, visual_context: str) -> None:
+        """Write a cache entry atomically so a partial write is never served as an answer"""
+        os.makedirs(VISUAL_CONTEXT_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=VISUAL_CONTEXT_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                cache_file.write(visual_context)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
     
     async def _generate_visual_context_parallel(self, scenes: List[SceneData]) -> List[SceneData]:
         """Generate visual context for all scenes in parallel"""
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_idx = {
-                executor.submit(self._generate_visual_context_for_scene, scene): idx 
-                for idx, scene in enumerate(scenes)
-            }
-            
-            for future in as_completed(future_to_idx):
-                idx = future_to_idx[future]
-                visual_context = future.result()
-                
-                if visual_context:
-                    scenes[idx].visual_context = visual_context
-                    scenes[idx].combined_context = f"{scenes[idx].transcript} | Visual Context: {visual_context}"
-                else:
-                    scenes[idx].combined_context = scenes[idx].transcript
+        # Bound in-flight requests to stay under the OpenAI rate limit
+        semaphore = asyncio.Semaphore(VISUAL_CONTEXT_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self._generate_visual_context_for_scene(scene, semaphore) for scene in scenes),
+            return_exceptions=True
+        )
+
+        for scene, visual_context in zip(scenes, results):
+            if isinstance(visual_context, Exception):
+                print(f"Failed to generate visual context for scene {scene.scene_id}: {str(visual_context)}")
+                visual_context = None
+
+            if visual_context:
+                scene.visual_context = visual_context
+                scene.combined_context = f"{scene.transcript} | Visual Context: {visual_context}"
+            else:
+                scene.combined_context = scene.transcript
         
         return scenes
     
@@ -310,10 +664,16 @@ Be concise and focus on searchable, meaningful information."""
         scene_texts = [scene.combined_context for scene in scenes]
         
         # Generate embeddings
-        embeddings = self.embedder.encode(scene_texts, convert_to_tensor=True)
+        embeddings = self.embedder.encode(scene_texts)
         
         # Convert to list format and attach to scenes
         for idx, scene in enumerate(scenes):
-            scene.embedding = embeddings[idx].cpu().numpy().tolist()
+            scene.embedding = embeddings[idx].tolist()
         
-        return scenes
\ No newline at end of file
+        return scenes
+
+
+@functools.lru_cache(maxsize=1)
+def get_video_processor() -> VideoProcessor:
+    """Process-wide VideoProcessor so the Whisper and embedding models load only once"""
+    return VideoProcessor()
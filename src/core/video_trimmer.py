@@ -13,23 +13,35 @@ import json
 
 from .models import VideoTimeline, SearchResult
 
+# Seconds before the cut that accurate trims seek to before decoding forward
+ACCURATE_SEEK_BACKOFF = 2.0
+
+# Containers whose muxer understands -movflags +faststart
+FASTSTART_EXTENSIONS = {'.mp4', '.m4v', '.mov'}
+
+# Concurrent ffmpeg trims in trim_videos_from_search
+TRIM_CONCURRENCY = min(8, os.cpu_count() or 1)
+
 
 class VideoTrimmer:
     """Handles video trimming operations using ffmpeg"""
     
     def __init__(self, output_dir: str = "data/trimmed_videos"):
         self.output_dir = output_dir
+        self._ffmpeg_available: Optional[bool] = None
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
     
     def _check_ffmpeg(self) -> bool:
-        """Check if ffmpeg is installed and available"""
-        try:
-            subprocess.run(['ffmpeg', '-version'], 
-                         capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Check if ffmpeg is installed and available (probed once, then cached)"""
+        if self._ffmpeg_available is None:
+            try:
+                subprocess.run(['ffmpeg', '-version'], 
+                             capture_output=True, check=True)
+                self._ffmpeg_available = True
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                self._ffmpeg_available = False
+        return self._ffmpeg_available
     
     def _format_time_for_ffmpeg(self, seconds: float) -> str:
         """Convert seconds to ffmpeg time format (HH:MM:SS.mmm)"""
@@ -43,16 +55,23 @@ class VideoTrimmer:
         input_path: str, 
         start_time: float, 
         end_time: float,
-        output_filename: Optional[str] = None
+        output_filename: Optional[str] = None,
+        accurate: bool = False
     ) -> str:
         """
         Trim a video from start_time to end_time
+
+        The default mode seeks on the input (-ss before -i) and stream-copies, so the
+        cut is near disk speed but starts on the keyframe at or before start_time.
+        Accurate mode seeks on the input to shortly before start_time, decodes the
+        remaining few seconds to land on the exact frame, and re-encodes the video.
         
         Args:
             input_path: Path to the original video file
             start_time: Start time in seconds
             end_time: End time in seconds
             output_filename: Optional custom filename, if None will generate one
+            accurate: Re-encode for a frame-accurate start instead of stream copying
             
         Returns:
             Path to the trimmed video file
@@ -76,18 +95,38 @@ class VideoTrimmer:
         output_path = os.path.join(self.output_dir, output_filename)
         
         # Format times for ffmpeg
-        start_time_str = self._format_time_for_ffmpeg(start_time)
         duration = end_time - start_time
         duration_str = self._format_time_for_ffmpeg(duration)
         
         # Build ffmpeg command
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-ss', start_time_str,
-            '-t', duration_str,
-            '-c', 'copy',  # Copy streams without re-encoding for speed
-            '-avoid_negative_ts', 'make_zero',
+        if accurate:
+            # Fast keyframe seek to just before the cut, then decode forward to the exact frame
+            input_seek = max(0.0, start_time - ACCURATE_SEEK_BACKOFF)
+            cmd = [
+                'ffmpeg',
+                '-ss', self._format_time_for_ffmpeg(input_seek),
+                '-i', input_path,
+                '-ss', self._format_time_for_ffmpeg(start_time - input_seek),
+                '-t', duration_str,
+                '-c:v', 'libx264',
+                '-preset', 'ultrafast',
+                '-c:a', 'copy'
+            ]
+        else:
+            cmd = [
+                'ffmpeg',
+                '-ss', self._format_time_for_ffmpeg(start_time),  # Seek on the input instead of decoding up to the cut
+                '-i', input_path,
+                '-t', duration_str,
+                '-c', 'copy',  # Copy streams without re-encoding for speed
+                '-avoid_negative_ts', 'make_zero'
+            ]
+
+        if Path(output_path).suffix.lower() in FASTSTART_EXTENSIONS:
+            # Move the moov atom to the front so the clip can start playing before it fully downloads
+            cmd += ['-movflags', '+faststart']
+
+        cmd += [
             '-y',  # Overwrite output file if it exists
             output_path
         ]
@@ -170,21 +209,23 @@ class VideoTrimmer:
             List of dictionaries with video info and trimmed paths
         """
         
-        trimmed_videos = []
-        
-        for timeline in video_timelines:
+        # ffmpeg trims are independent subprocesses; overlap them up to a bounded concurrency
+        semaphore = asyncio.Semaphore(TRIM_CONCURRENCY)
+
+        async def trim_one(timeline: VideoTimeline) -> Optional[dict]:
             try:
                 # Get the original video path
                 original_path = get_video_path_func(timeline.video_id)
                 
                 if not original_path or not os.path.exists(original_path):
                     print(f"Warning: Original video not found for {timeline.video_id}")
-                    continue
+                    return None
                 
                 # Trim the video
-                trimmed_path = await self.trim_video_from_timeline(timeline, original_path)
+                async with semaphore:
+                    trimmed_path = await self.trim_video_from_timeline(timeline, original_path)
                 
-                trimmed_videos.append({
+                return {
                     'video_id': timeline.video_id,
                     'video_title': timeline.video_title,
                     'original_path': original_path,
@@ -193,13 +234,15 @@ class VideoTrimmer:
                     'end_time': timeline.overall_end_time,
                     'duration': timeline.overall_end_time - timeline.overall_start_time,
                     'reasoning': timeline.relevance_reasoning
-                })
+                }
                 
             except Exception as e:
                 print(f"Error trimming video {timeline.video_id}: {str(e)}")
-                continue
+                return None
+        
+        results = await asyncio.gather(*(trim_one(timeline) for timeline in video_timelines))
         
-        return trimmed_videos
+        return [result for result in results if result is not None]
     
     def get_trimmed_video_info(self, trimmed_path: str) -> dict:
         """Get information about a trimmed video file"""
@@ -548,13 +591,15 @@ class VideoTrimmer:
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
         
-        for filename in os.listdir(self.output_dir):
-            file_path = os.path.join(self.output_dir, filename)
-            if os.path.isfile(file_path):
-                file_age = current_time - os.path.getmtime(file_path)
+        # DirEntry caches the file type from the directory read, leaving one stat per file
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                file_age = current_time - entry.stat().st_mtime
                 if file_age > max_age_seconds:
                     try:
-                        os.remove(file_path)
-                        print(f"Cleaned up old trimmed video: {filename}")
+                        os.remove(entry.path)
+                        print(f"Cleaned up old trimmed video: {entry.name}")
                     except Exception as e:
-                        print(f"Error cleaning up {filename}: {e}")
\ No newline at end of file
+                        print(f"Error cleaning up {entry.name}: {e}")
\ No newline at end of file
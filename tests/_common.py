@@ -0,0 +1,305 @@
+"""
+Shared helpers for the API test scripts
+
+Timeouts are (connect, read) tuples: CONNECT_TIMEOUT bounds reaching the server so a dead
+one fails in seconds, and the read part is sized to the endpoint (e.g. 120-300s for /search).
+"""
+
+import atexit
+import functools
+import inspect
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Point the scripts at another server (e.g. a parallel CI instance) with VIDEO_API
+BASE_URL = os.environ.get("VIDEO_API", "http://localhost:8000").rstrip("/")
+SEARCH_URL = f"{BASE_URL}/search"
+HEALTH_URL = f"{BASE_URL}/health"
+
+# Retry transient gateway errors and dropped connections instead of failing a multi-minute run.
+# Read timeouts are not retried (a slow search would otherwise run again), and an exhausted
+# status retry returns the last response so callers still see its status code
+RETRY = Retry(
+    total=3,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST", "HEAD"]),
+    raise_on_status=False
+)
+
+# One session per process so every script reuses the same connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=RETRY))
+SESSION.headers.update({"Accept": "application/json"})
+atexit.register(SESSION.close)
+
+# Shared worker pool for fanning out requests; sized below the connection pool so workers never wait on a socket
+REQUEST_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="api-request")
+atexit.register(REQUEST_EXECUTOR.shutdown)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fail fast when the server is unreachable; only the read timeout needs to cover a slow search
+CONNECT_TIMEOUT = 10
+
+# A live local server answers health checks instantly; a dead one should not hold up the run
+HEALTH_TIMEOUT = 2
+
+# Responses larger than this are treated as runaway and abandoned mid-download
+MAX_RESPONSE_BYTES = 8 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Size probes fetch a single byte; 206 is the expected success status for them
+RANGE_PROBE_HEADERS = {"Range": "bytes=0-0"}
+PROBE_OK = (200, 206)
+
+# Set VERIFY_DOWNLOADS=1 to pull generated videos end to end instead of probing their size
+VERIFY_DOWNLOADS = os.environ.get("VERIFY_DOWNLOADS") == "1"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Merged video filenames look like merged_<query>_<N>segments_<duration>s_<id>.mp4
+FILENAME_RE = re.compile(r"_(?P<segments>\d+)segments_(?P<duration>\d+(?:\.\d+)?)s_")
+
+
+@functools.lru_cache(maxsize=1)
+def server_ok():
+    """Check whether the API server is up, hitting it at most once per process"""
+    try:
+        # Plain requests rather than SESSION, whose retry/backoff would hold up the verdict on a dead server
+        response = requests.get(HEALTH_URL, timeout=HEALTH_TIMEOUT)
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def check_ffmpeg():
+    """Check if ffmpeg and ffprobe are on PATH, without spawning either"""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def poll_until(fn, *, initial=0.25, cap=2.0, deadline=30.0):
+    """Call fn with exponential backoff until it returns something truthy, returning that value (None on deadline)"""
+    start = time.monotonic()
+    delay = initial
+    while True:
+        result = fn()
+        if result:
+            return result
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, cap)
+
+
+def map_concurrently(fn, items):
+    """Apply fn to every item on the shared request pool, returning results in input order"""
+    return list(REQUEST_EXECUTOR.map(fn, items))
+
+
+_OUTPUT_LOCK = threading.Lock()
+
+
+class _ThreadLocalStdout:
+    """sys.stdout stand-in that sends writes to the current thread's capture buffer, if any"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+    
+    def _target(self):
+        buffer = getattr(self.local, "buffer", None)
+        return self.stream if buffer is None else buffer
+    
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _thread_local_stdout():
+    """Install (once) and return the per-thread stdout router"""
+    if not isinstance(sys.stdout, _ThreadLocalStdout):
+        sys.stdout = _ThreadLocalStdout(sys.stdout)
+    return sys.stdout
+
+
+@contextmanager
+def captured_output():
+    """Collect everything the current thread prints into a StringIO"""
+    router = _thread_local_stdout()
+    previous = getattr(router.local, "buffer", None)
+    buffer = io.StringIO()
+    router.local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        router.local.buffer = previous
+
+
+def _run_captured(fn):
+    """Run fn with its output captured, returning (output, exception or None)"""
+    with captured_output() as buffer:
+        try:
+            fn()
+            error = None
+        except Exception as e:
+            error = e
+    return buffer.getvalue(), error
+
+
+def _emit(text):
+    """Write a block of captured output in one call, never interleaved with another block"""
+    with _OUTPUT_LOCK:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+def buffered_output(fn):
+    """Decorator: collect everything fn prints and emit it with a single write when it returns"""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            buffer = None
+            try:
+                with captured_output() as buffer:
+                    return await fn(*args, **kwargs)
+            finally:
+                if buffer is not None:
+                    _emit(buffer.getvalue())
+        return async_wrapper
+    
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        buffer = None
+        try:
+            with captured_output() as buffer:
+                return fn(*args, **kwargs)
+        finally:
+            if buffer is not None:
+                _emit(buffer.getvalue())
+    return wrapper
+
+
+def run_concurrently(*fns):
+    """Run independent test functions in parallel, printing each one's output as a block in call order"""
+    _thread_local_stdout()
+    with ThreadPoolExecutor(max_workers=len(fns)) as executor:
+        futures = [executor.submit(_run_captured, fn) for fn in fns]
+        errors = []
+        for future in futures:
+            output, error = future.result()
+            _emit(output)
+            if error is not None:
+                errors.append(error)
+    if errors:
+        raise errors[0]
+
+
+def parse_merged_filename(filename):
+    """Return (segments, duration_seconds) from a merged video filename, or None"""
+    match = FILENAME_RE.search(filename)
+    if not match:
+        return None
+    return int(match.group("segments")), float(match.group("duration"))
+
+
+def encode_payload(payload):
+    """Serialize a request body once (with orjson when available) so it can be reused across calls"""
+    if orjson is None:
+        return json.dumps(payload, separators=(",", ":")).encode()
+    return orjson.dumps(payload)
+
+
+def post_json(url, payload, **kwargs):
+    """POST a JSON body, serializing it with orjson unless it is already encoded bytes"""
+    data = payload if isinstance(payload, bytes) else encode_payload(payload)
+    return SESSION.post(url, data=data, headers=JSON_HEADERS, **kwargs)
+
+
+def run_search(payload, read_timeout=120):
+    """POST a payload to /search, returning (status_code, data, error)
+    
+    data is the parsed JSON on a 200 and the body text otherwise, so failures can be shown;
+    error is the exception when the request itself failed, with status_code and data None.
+    """
+    try:
+        with post_json(SEARCH_URL, payload, stream=True, timeout=(CONNECT_TIMEOUT, read_timeout)) as response:
+            data = json_of(response) if response.status_code == 200 else text_of(response)
+        return response.status_code, data, None
+    except Exception as e:
+        return None, None, e
+
+
+def probe_size(url, timeout=(CONNECT_TIMEOUT, 10)):
+    """Request the first byte of url, returning (status_code, total_size)
+    
+    A ranged GET keeps the pooled connection alive where some servers close it after HEAD.
+    The full size comes from Content-Range on a 206, or Content-Length if the range was ignored.
+    """
+    with SESSION.get(url, headers=RANGE_PROBE_HEADERS, stream=True, timeout=timeout) as response:
+        size = response.headers.get("Content-Range", "").rpartition("/")[2]
+        if not size or size == "*":
+            size = response.headers.get("Content-Length")
+        return response.status_code, size
+
+
+def download_size(url, timeout=(CONNECT_TIMEOUT, 120)):
+    """Stream the whole of url in 1 MiB chunks without keeping it, returning (status_code, bytes_received)"""
+    with SESSION.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        received = sum(len(chunk) for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE))
+        return response.status_code, received
+
+
+def read_body(response, max_bytes=MAX_RESPONSE_BYTES):
+    """Read a (streamed) response body in chunks, giving up once it exceeds max_bytes"""
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None and int(content_length) > max_bytes:
+        response.close()
+        raise ValueError(f"Response too large: {content_length} bytes (limit {max_bytes})")
+    
+    chunks = []
+    received = 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        received += len(chunk)
+        if received > max_bytes:
+            response.close()
+            raise ValueError(f"Response exceeded {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def json_of(response):
+    """Parse a response body with orjson (when available) instead of response.json()"""
+    body = read_body(response)
+    return json.loads(body) if orjson is None else orjson.loads(body)
+
+
+def text_of(response):
+    """Decode a response body for display, with the same size limit as json_of"""
+    return read_body(response).decode(response.encoding or "utf-8", errors="replace")
@@ -0,0 +1,21 @@
+"""
+pytest hooks shared by the API test scripts
+"""
+
+import pytest
+
+from tests._common import server_ok
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize query_case from the module's QUERY_CASES so each query is its own test"""
+    if "query_case" in metafunc.fixturenames:
+        cases = metafunc.module.QUERY_CASES
+        metafunc.parametrize("query_case", cases, ids=[case["query"] for case in cases])
+
+
+@pytest.fixture(autouse=True)
+def require_server(request):
+    """Skip tests in modules that set REQUIRES_SERVER when the API server is down (checked once per worker)"""
+    if getattr(request.module, "REQUIRES_SERVER", False) and not server_ok():
+        pytest.skip("API server is not running - start with: python start_server.py")
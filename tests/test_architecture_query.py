@@ -6,8 +6,12 @@ Test script specifically for architecture-related queries to verify context cont
 import requests
 import json
 import sys
+import os
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import parse_merged_filename
+
 
 def test_architecture_queries():
     """Test various architecture-related queries"""
@@ -66,11 +70,10 @@ def test_architecture_queries():
                     print(f"🎯 Merged Video Created: {data['merged_video_url']}")
                     
                     # Extract info from filename
-                    filename = data['merged_video_url'].split('/')[-1]
-                    if 'segments' in filename:
-                        segments_part = filename.split('segments')[0].split('_')[-1]
-                        duration_part = filename.split('_')[-2]
-                        print(f"📊 Video contains {segments_part} segments, duration: {duration_part}")
+                    parsed = parse_merged_filename(data['merged_video_url'])
+                    if parsed:
+                        segments, duration = parsed
+                        print(f"📊 Video contains {segments} segments, duration: {duration:.1f}s")
                     
                     # Test video accessibility
                     video_url = f"{base_url}{data['merged_video_url']}"
@@ -149,28 +152,17 @@ def test_specific_architecture_case():
                 print(f"🎬 Video: {filename}")
                 
                 # Parse filename for details
-                if 'segments' in filename:
-                    try:
-                        parts = filename.split('_')
-                        segments_count = None
-                        duration = None
-                        
-                        for i, part in enumerate(parts):
-                            if 'segments' in part:
-                                segments_count = part.replace('segments', '')
-                            if part.endswith('s') and '.' in parts[i+1]:
-                                duration = part
-                        
-                        if segments_count and duration:
-                            print(f"📊 Contains {segments_count} segments, {duration} duration")
-                            
-                            if int(segments_count) > 1:
-                                print("✅ GOOD: Multiple segments suggest title + detailed explanation included")
-                            else:
-                                print("⚠️  WARNING: Only 1 segment - might be missing detailed explanation")
-                                
-                    except:
-                        print("Could not parse filename details")
+                parsed = parse_merged_filename(filename)
+                if parsed:
+                    segments_count, duration = parsed
+                    print(f"📊 Contains {segments_count} segments, {duration:.1f}s duration")
+                    
+                    if segments_count > 1:
+                        print("✅ GOOD: Multiple segments suggest title + detailed explanation included")
+                    else:
+                        print("⚠️  WARNING: Only 1 segment - might be missing detailed explanation")
+                else:
+                    print("Could not parse filename details")
                 
             else:
                 print("❌ FAILED: No merged video created")
@@ -7,6 +7,10 @@ architecture explanation sequences instead of isolated irrelevant segments
 import requests
 import json
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import parse_merged_filename
 
 
 def test_architecture_explanation_sequence():
@@ -43,19 +47,7 @@ def test_architecture_explanation_sequence():
                 print(f"✅ Video created: {filename}")
                 
                 # Parse metadata
-                segments = 0
-                duration = 0
-                
-                if 'segments' in filename:
-                    parts = filename.split('_')
-                    for i, part in enumerate(parts):
-                        if 'segments' in part:
-                            segments = int(part.replace('segments', ''))
-                        if part.endswith('s') and '.' in part:
-                            try:
-                                duration = float(part[:-1])
-                            except:
-                                pass
+                segments, duration = parse_merged_filename(filename) or (0, 0.0)
                 
                 print(f"📊 Result: {segments} segments, {duration:.1f}s")
                 
@@ -154,19 +146,7 @@ def test_other_explanation_queries():
                     filename = data['merged_video_url']
                     
                     # Quick analysis
-                    segments = 0
-                    duration = 0
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for part in parts:
-                            if 'segments' in part:
-                                segments = int(part.replace('segments', ''))
-                            if part.endswith('s') and '.' in part:
-                                try:
-                                    duration = float(part[:-1])
-                                    break
-                                except:
-                                    pass
+                    segments, duration = parse_merged_filename(filename) or (0, 0.0)
                     
                     if segments >= 2 and duration >= 60 and duration <= 180:
                         print(f"✅ Good sequence: {segments} segments, {duration:.1f}s")
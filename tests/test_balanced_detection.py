@@ -6,8 +6,12 @@ Test the balanced slide detection to ensure proper scene separation
 import requests
 import json
 import sys
+import os
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import parse_merged_filename
+
 
 def test_architecture_queries():
     """Test both architecture queries to ensure proper scene separation"""
@@ -52,19 +56,7 @@ def test_architecture_queries():
                     filename = data['merged_video_url']
                     
                     # Parse metadata
-                    segments = 0
-                    duration = 0
-                    
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for i, part in enumerate(parts):
-                            if 'segments' in part:
-                                segments = int(part.replace('segments', ''))
-                            if part.endswith('s') and '.' in part:
-                                try:
-                                    duration = float(part[:-1])
-                                except:
-                                    pass
+                    segments, duration = parse_merged_filename(filename) or (0, 0.0)
                     
                     print(f"Result: {segments} segments, {duration:.1f}s")
                     
@@ -4,11 +4,18 @@ Test script to verify all hardcoded architecture/AWS logic has been removed
 and the system now relies purely on AI filtering
 """
 
-import requests
 import json
 import sys
+import os
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import CONNECT_TIMEOUT, SEARCH_URL, buffered_output, encode_payload, json_of, map_concurrently, parse_merged_filename, post_json, run_search, server_ok, text_of
 
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
+
+
+@buffered_output
 def test_architecture_query_no_hardcoding():
     """Test that architecture queries work without hardcoded logic"""
     
@@ -33,29 +40,17 @@ def test_architecture_query_no_hardcoding():
     print()
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        response = post_json(SEARCH_URL, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             if data.get('merged_video_url'):
                 filename = data['merged_video_url']
                 print(f"✅ Video created: {filename}")
                 
                 # Parse metadata
-                segments = 0
-                duration = 0
-                
-                if 'segments' in filename:
-                    parts = filename.split('_')
-                    for i, part in enumerate(parts):
-                        if 'segments' in part:
-                            segments = int(part.replace('segments', ''))
-                        if part.endswith('s') and '.' in part:
-                            try:
-                                duration = float(part[:-1])
-                            except:
-                                pass
+                segments, duration = parse_merged_filename(filename) or (0, 0.0)
                 
                 print(f"📊 Result: {segments} segments, {duration:.1f}s")
                 
@@ -114,12 +109,13 @@ def test_architecture_query_no_hardcoding():
                 
         else:
             print(f"❌ Search failed: {response.status_code}")
-            print(response.text)
+            print(text_of(response))
             
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
+@buffered_output
 def test_different_queries_clean():
     """Test various queries to ensure no hardcoded logic interferes"""
     
@@ -141,60 +137,34 @@ def test_different_queries_clean():
         }
     ]
     
-    for test_case in test_queries:
-        query = test_case["query"]
-        expected = test_case["expected"]
+    # Serialize every payload up front, then send them all at once and report in order
+    payloads = [encode_payload({"query": test_case["query"], "limit": 20, "min_score": 0.1}) for test_case in test_queries]
+    for test_case, (status_code, data, error) in zip(test_queries, map_concurrently(run_search, payloads)):
+        print(f"\n📝 Query: '{test_case['query']}'")
+        print(f"Expected: {test_case['expected']}")
         
-        print(f"\n📝 Query: '{query}'")
-        print(f"Expected: {expected}")
-        
-        search_request = {
-            "query": query,
-            "limit": 20,
-            "min_score": 0.1
-        }
-        
-        try:
-            response = requests.post("http://localhost:8000/search", json=search_request, timeout=120)
+        if error is not None:
+            print(f"❌ Error: {error}")
+        elif status_code != 200:
+            print(f"❌ Failed: {status_code}")
+        elif data.get('merged_video_url'):
+            filename = data['merged_video_url']
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('merged_video_url'):
-                    filename = data['merged_video_url']
-                    
-                    # Quick analysis
-                    segments = 0
-                    duration = 0
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for part in parts:
-                            if 'segments' in part:
-                                segments = int(part.replace('segments', ''))
-                            if part.endswith('s') and '.' in part:
-                                try:
-                                    duration = float(part[:-1])
-                                    break
-                                except:
-                                    pass
-                    
-                    if segments <= 2 and duration < 90:
-                        print(f"✅ Clean & Focused: {segments} segments, {duration:.1f}s")
-                    elif segments <= 3 and duration < 150:
-                        print(f"⚠️  Moderate: {segments} segments, {duration:.1f}s")
-                    else:
-                        print(f"❌ Too broad: {segments} segments, {duration:.1f}s")
-                        
-                else:
-                    print("❌ No video (might be too strict)")
-                    
+            # Quick analysis
+            segments, duration = parse_merged_filename(filename) or (0, 0.0)
+            
+            if segments <= 2 and duration < 90:
+                print(f"✅ Clean & Focused: {segments} segments, {duration:.1f}s")
+            elif segments <= 3 and duration < 150:
+                print(f"⚠️  Moderate: {segments} segments, {duration:.1f}s")
             else:
-                print(f"❌ Failed: {response.status_code}")
+                print(f"❌ Too broad: {segments} segments, {duration:.1f}s")
                 
-        except Exception as e:
-            print(f"❌ Error: {e}")
+        else:
+            print("❌ No video (might be too strict)")
 
 
+@buffered_output
 def verify_no_hardcoding_in_logs():
     """Provide guidance on verifying clean implementation"""
     
@@ -230,14 +200,9 @@ if __name__ == "__main__":
     print()
     
     # Check server
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running")
-        else:
-            print("❌ Server health check failed")
-            sys.exit(1)
-    except:
+    if server_ok():
+        print("✅ Server is running")
+    else:
         print("❌ Server not running - start with: python start_server.py")
         sys.exit(1)
     
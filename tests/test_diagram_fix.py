@@ -3,11 +3,18 @@
 Test script for architecture diagram query fixes
 """
 
-import requests
 import json
 import sys
+import os
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import CONNECT_TIMEOUT, SEARCH_URL, buffered_output, encode_payload, json_of, map_concurrently, parse_merged_filename, post_json, run_concurrently, run_search, server_ok, text_of
 
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
+
+
+@buffered_output
 def test_architecture_diagram_query():
     """Test the specific architecture diagram query with enhanced logging"""
     
@@ -34,64 +41,52 @@ def test_architecture_diagram_query():
     print()
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        response = post_json(SEARCH_URL, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             if data.get('merged_video_url'):
                 filename = data['merged_video_url']
                 print(f"✅ Video created: {filename}")
                 
                 # Parse video metadata from filename
-                if 'segments' in filename and '_' in filename:
-                    parts = filename.split('_')
-                    segments = None
-                    duration = None
+                parsed = parse_merged_filename(filename)
+                if parsed:
+                    segments_num, duration_num = parsed
+                    print(f"📊 Result: {segments_num} segments, {duration_num}s duration")
                     
-                    for i, part in enumerate(parts):
-                        if 'segments' in part:
-                            segments = part.replace('segments', '')
-                        if part.endswith('s') and part[:-1].replace('.', '').isdigit():
-                            duration = part[:-1]
+                    print()
+                    print("📈 Analysis:")
+                
+                    if segments_num <= 3:
+                        print(f"✅ GOOD: {segments_num} segments (focused, not too many irrelevant slides)")
+                    else:
+                        print(f"⚠️  CONCERN: {segments_num} segments (might still include irrelevant content)")
+                
+                    if duration_num >= 15:
+                        print(f"✅ GOOD: {duration_num}s duration (sufficient time to show diagrams)")
+                    else:
+                        print(f"⚠️  CONCERN: {duration_num}s duration (might be too short for proper diagram viewing)")
+                
+                    # Scene 16 specific check
+                    if duration_num >= 8:
+                        print("✅ Scene 16 likely has proper 8+ second duration")
+                    else:
+                        print("❌ Scene 16 might still be too short")
                     
-                    if segments and duration:
-                        print(f"📊 Result: {segments} segments, {duration}s duration")
-                        
-                        # Analyze results
-                        segments_num = int(segments)
-                        duration_num = float(duration)
-                        
-                        print()
-                        print("📈 Analysis:")
-                        
-                        if segments_num <= 3:
-                            print(f"✅ GOOD: {segments_num} segments (focused, not too many irrelevant slides)")
-                        else:
-                            print(f"⚠️  CONCERN: {segments_num} segments (might still include irrelevant content)")
-                        
-                        if duration_num >= 15:
-                            print(f"✅ GOOD: {duration_num}s duration (sufficient time to show diagrams)")
-                        else:
-                            print(f"⚠️  CONCERN: {duration_num}s duration (might be too short for proper diagram viewing)")
-                        
-                        # Scene 16 specific check
-                        if duration_num >= 8:
-                            print("✅ Scene 16 likely has proper 8+ second duration")
-                        else:
-                            print("❌ Scene 16 might still be too short")
-                            
             else:
                 print("❌ No video created")
                 
         else:
             print(f"❌ Request failed: {response.status_code}")
-            print(f"Response: {response.text}")
+            print(f"Response: {text_of(response)}")
             
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
+@buffered_output
 def test_comparison_queries():
     """Test different architecture-related queries to see the filtering differences"""
     
@@ -117,60 +112,39 @@ def test_comparison_queries():
         }
     ]
     
-    for test_case in queries:
+    # Serialize every payload up front, then send them all at once and report in order
+    payloads = [encode_payload({"query": test_case["query"], "limit": 15, "min_score": 0.1}) for test_case in queries]
+    for test_case, (status_code, data, error) in zip(queries, map_concurrently(run_search, payloads)):
         query = test_case["query"]
-        expected = test_case["expected"]
         
         print(f"\n📝 Query: '{query}'")
-        print(f"Expected: {expected}")
-        
-        search_request = {
-            "query": query,
-            "limit": 15,
-            "min_score": 0.1
-        }
+        print(f"Expected: {test_case['expected']}")
         
-        try:
-            response = requests.post("http://localhost:8000/search", json=search_request, timeout=120)
+        if error is not None:
+            print(f"❌ Error: {error}")
+        elif status_code != 200:
+            print(f"❌ Failed: {status_code}")
+        elif data.get('merged_video_url'):
+            filename = data['merged_video_url']
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('merged_video_url'):
-                    filename = data['merged_video_url']
-                    
-                    # Parse segments and duration
-                    segments = "0"
-                    duration = "0"
-                    
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for i, part in enumerate(parts):
-                            if 'segments' in part:
-                                segments = part.replace('segments', '')
-                            if part.endswith('s') and part[:-1].replace('.', '').isdigit():
-                                duration = part[:-1]
-                    
-                    print(f"Result: {segments} segments, {duration}s")
-                    
-                    # Quick analysis
-                    if query == "architecture diagram" and int(segments) <= 3:
-                        print("✅ Good filtering - few segments for diagram query")
-                    elif "explained" in query and int(segments) >= 3:
-                        print("✅ Good coverage - multiple segments for explanation query")
-                    else:
-                        print("📊 Mixed results")
-                        
-                else:
-                    print("❌ No video")
-                    
+            # Parse segments and duration
+            segments, duration = parse_merged_filename(filename) or (0, 0.0)
+            
+            print(f"Result: {segments} segments, {duration}s")
+            
+            # Quick analysis
+            if query == "architecture diagram" and segments <= 3:
+                print("✅ Good filtering - few segments for diagram query")
+            elif "explained" in query and segments >= 3:
+                print("✅ Good coverage - multiple segments for explanation query")
             else:
-                print(f"❌ Failed: {response.status_code}")
+                print("📊 Mixed results")
                 
-        except Exception as e:
-            print(f"❌ Error: {e}")
+        else:
+            print("❌ No video")
 
 
+@buffered_output
 def test_scene_16_specifically():
     """Test to ensure scene 16 is included and has proper duration"""
     
@@ -194,23 +168,23 @@ def test_scene_16_specifically():
     print()
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=120)
+        response = post_json(SEARCH_URL, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 120))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             if data.get('merged_video_url'):
                 filename = data['merged_video_url']
                 print(f"✅ Video: {filename}")
                 
                 # Check if it's a substantial video
-                if 'segments' in filename:
-                    segments = filename.split('segments')[0].split('_')[-1]
-                    duration = filename.split('_')[-2]
+                parsed = parse_merged_filename(filename)
+                if parsed:
+                    segments, duration = parsed
                     
-                    print(f"📊 {segments} segments, {duration} duration")
+                    print(f"📊 {segments} segments, {duration}s duration")
                     
-                    if int(segments) >= 2 and float(duration[:-1]) >= 15:
+                    if segments >= 2 and duration >= 15:
                         print("🎉 SUCCESS: Scene 16 likely included with proper duration!")
                     else:
                         print("⚠️  Scene 16 might still have issues")
@@ -231,23 +205,20 @@ if __name__ == "__main__":
     print()
     
     # Check server
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running")
-        else:
-            print("❌ Server health check failed")
-            sys.exit(1)
-    except:
+    if server_ok():
+        print("✅ Server is running")
+    else:
         print("❌ Server not running - start with: python start_server.py")
         sys.exit(1)
     
     print()
     
-    # Run tests
-    test_architecture_diagram_query()
-    test_comparison_queries()
-    test_scene_16_specifically()
+    # Run tests (independent, so run them side by side)
+    run_concurrently(
+        test_architecture_diagram_query,
+        test_comparison_queries,
+        test_scene_16_specifically
+    )
     
     print()
     print("🎯 Expected Improvements:")
@@ -3,9 +3,15 @@
 Test the conservative fallback fix to prevent entire video inclusion
 """
 
-import requests
 import json
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import SEARCH_URL, SESSION, json_of, parse_merged_filename, server_ok, text_of
+
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
 
 
 def test_architecture_explanation_query():
@@ -32,66 +38,54 @@ def test_architecture_explanation_query():
     print()
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        with SESSION.post(SEARCH_URL, json=search_request, timeout=180, stream=True) as response:
         
-        if response.status_code == 200:
-            data = response.json()
+            if response.status_code == 200:
+                data = json_of(response)
             
-            if data.get('merged_video_url'):
-                filename = data['merged_video_url']
-                print(f"✅ Video created: {filename}")
+                if data.get('merged_video_url'):
+                    filename = data['merged_video_url']
+                    print(f"✅ Video created: {filename}")
                 
-                # Parse metadata
-                segments = 0
-                duration = 0
+                    # Parse metadata
+                    segments, duration = parse_merged_filename(filename) or (0, 0.0)
                 
-                if 'segments' in filename:
-                    parts = filename.split('_')
-                    for i, part in enumerate(parts):
-                        if 'segments' in part:
-                            segments = int(part.replace('segments', ''))
-                        if part.endswith('s') and '.' in part:
-                            try:
-                                duration = float(part[:-1])
-                            except:
-                                pass
+                    print(f"📊 Result: {segments} segments, {duration:.1f}s")
                 
-                print(f"📊 Result: {segments} segments, {duration:.1f}s")
+                    # Detailed analysis
+                    print("\n📈 Analysis:")
                 
-                # Detailed analysis
-                print("\n📈 Analysis:")
+                    if duration > 350:
+                        print(f"❌ STILL ENTIRE VIDEO: {duration:.1f}s - fallback logic still too aggressive")
+                        print("   Check server logs for fallback messages")
+                    elif duration > 250:
+                        print(f"⚠️  VERY LONG: {duration:.1f}s - some improvement but still too much content")
+                    elif duration > 150:
+                        print(f"⚠️  LONG: {duration:.1f}s - better but might include non-essential content")
+                    elif duration >= 60:
+                        print(f"✅ GOOD RANGE: {duration:.1f}s - reasonable amount of content")
+                    elif duration >= 30:
+                        print(f"✅ FOCUSED: {duration:.1f}s - well-filtered content")
+                    else:
+                        print(f"⚠️  TOO SHORT: {duration:.1f}s - might be missing important content")
                 
-                if duration > 350:
-                    print(f"❌ STILL ENTIRE VIDEO: {duration:.1f}s - fallback logic still too aggressive")
-                    print("   Check server logs for fallback messages")
-                elif duration > 250:
-                    print(f"⚠️  VERY LONG: {duration:.1f}s - some improvement but still too much content")
-                elif duration > 150:
-                    print(f"⚠️  LONG: {duration:.1f}s - better but might include non-essential content")
-                elif duration >= 60:
-                    print(f"✅ GOOD RANGE: {duration:.1f}s - reasonable amount of content")
-                elif duration >= 30:
-                    print(f"✅ FOCUSED: {duration:.1f}s - well-filtered content")
+                    # Check segments
+                    if segments == 1 and duration > 200:
+                        print(f"❌ SINGLE LARGE SEGMENT: Likely scene boundary consolidation issue")
+                    elif segments == 1:
+                        print(f"✅ SINGLE FOCUSED SEGMENT: Good for concise answer")
+                    elif 2 <= segments <= 5:
+                        print(f"✅ MULTIPLE SEGMENTS: Good scene separation")
+                    else:
+                        print(f"⚠️  MANY SEGMENTS: {segments} - might include irrelevant content")
+                    
                 else:
-                    print(f"⚠️  TOO SHORT: {duration:.1f}s - might be missing important content")
+                    print("❌ No video created")
+                    print("Check server logs for filtering or processing errors")
                 
-                # Check segments
-                if segments == 1 and duration > 200:
-                    print(f"❌ SINGLE LARGE SEGMENT: Likely scene boundary consolidation issue")
-                elif segments == 1:
-                    print(f"✅ SINGLE FOCUSED SEGMENT: Good for concise answer")
-                elif 2 <= segments <= 5:
-                    print(f"✅ MULTIPLE SEGMENTS: Good scene separation")
-                else:
-                    print(f"⚠️  MANY SEGMENTS: {segments} - might include irrelevant content")
-                    
             else:
-                print("❌ No video created")
-                print("Check server logs for filtering or processing errors")
-                
-        else:
-            print(f"❌ Search failed: {response.status_code}")
-            print(response.text)
+                print(f"❌ Search failed: {response.status_code}")
+                print(text_of(response))
             
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -132,38 +126,29 @@ def test_fallback_scenarios():
         }
         
         try:
-            response = requests.post("http://localhost:8000/search", json=search_request, timeout=120)
+            with SESSION.post(SEARCH_URL, json=search_request, timeout=120, stream=True) as response:
             
-            if response.status_code == 200:
-                data = response.json()
+                if response.status_code == 200:
+                    data = json_of(response)
                 
-                if data.get('merged_video_url'):
-                    filename = data['merged_video_url']
+                    if data.get('merged_video_url'):
+                        filename = data['merged_video_url']
                     
-                    # Quick analysis
-                    duration = 0
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for part in parts:
-                            if part.endswith('s') and '.' in part:
-                                try:
-                                    duration = float(part[:-1])
-                                    break
-                                except:
-                                    pass
+                        # Quick analysis
+                        _, duration = parse_merged_filename(filename) or (0, 0.0)
                     
-                    if duration > 300:
-                        print(f"❌ Entire video: {duration:.1f}s")
-                    elif duration > 150:
-                        print(f"⚠️  Long: {duration:.1f}s")
-                    else:
-                        print(f"✅ Reasonable: {duration:.1f}s")
+                        if duration > 300:
+                            print(f"❌ Entire video: {duration:.1f}s")
+                        elif duration > 150:
+                            print(f"⚠️  Long: {duration:.1f}s")
+                        else:
+                            print(f"✅ Reasonable: {duration:.1f}s")
                         
-                else:
-                    print("❌ No video")
+                    else:
+                        print("❌ No video")
                     
-            else:
-                print(f"❌ Failed: {response.status_code}")
+                else:
+                    print(f"❌ Failed: {response.status_code}")
                 
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -207,14 +192,9 @@ if __name__ == "__main__":
     print()
     
     # Check server
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running")
-        else:
-            print("❌ Server health check failed")
-            sys.exit(1)
-    except:
+    if server_ok():
+        print("✅ Server is running")
+    else:
         print("❌ Server not running - start with: python start_server.py")
         sys.exit(1)
     
@@ -7,26 +7,18 @@ import requests
 import json
 import sys
 import os
-import subprocess
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import BASE_URL, CONNECT_TIMEOUT, PROBE_OK, SEARCH_URL, VERIFY_DOWNLOADS, buffered_output, check_ffmpeg, download_size, json_of, post_json, probe_size, server_ok
 
-def check_ffmpeg():
-    """Check if ffmpeg is installed"""
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
 
 
+@buffered_output
 def test_merged_video_search():
     """Test the enhanced search API with merged video creation"""
     
-    # API endpoint
-    base_url = "http://localhost:8000"
-    search_endpoint = f"{base_url}/search"
-    
     # Test search request
     search_request = {
         "query": "neural networks and machine learning",
@@ -37,7 +29,7 @@ def test_merged_video_search():
     print("🎬 Testing Merged Video Creation with Search API")
     print("=" * 65)
     print(f"Query: '{search_request['query']}'")
-    print(f"Endpoint: {search_endpoint}")
+    print(f"Endpoint: {SEARCH_URL}")
     print()
     
     try:
@@ -45,10 +37,10 @@ def test_merged_video_search():
         print("📡 Making API request and creating merged video...")
         print("⚠️  This may take a while as it processes and stitches video segments...")
         
-        response = requests.post(search_endpoint, json=search_request, timeout=300)  # 5 minute timeout
+        response = post_json(SEARCH_URL, search_request, timeout=(CONNECT_TIMEOUT, 300))  # 5 minute read timeout
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             print("✅ Request successful!")
             print()
@@ -64,7 +56,7 @@ def test_merged_video_search():
                 print("🎯 MERGED VIDEO (Main Result):")
                 print("=" * 50)
                 print(f"📹 Filename: {merged['merged_filename']}")
-                print(f"🌐 Download URL: {base_url}{merged['merged_url']}")
+                print(f"🌐 Download URL: {BASE_URL}{merged['merged_url']}")
                 print(f"⏱️  Total Duration: {merged['total_duration_seconds']:.1f} seconds")
                 print(f"📊 File Size: {merged['file_size_mb']} MB")
                 print(f"🔢 Segments Included: {merged['segments_count']}")
@@ -79,17 +71,21 @@ def test_merged_video_search():
                 print()
                 
                 # Test downloading the merged video
-                merged_url = f"{base_url}{merged['merged_url']}"
+                merged_url = f"{BASE_URL}{merged['merged_url']}"
                 try:
-                    print("🔍 Checking merged video accessibility...")
-                    head_response = requests.head(merged_url)
-                    if head_response.status_code == 200:
-                        file_size = head_response.headers.get('content-length', 'Unknown')
+                    if VERIFY_DOWNLOADS:
+                        print("🔍 Downloading merged video to verify it...")
+                        status_code, file_size = download_size(merged_url)
+                    else:
+                        print("🔍 Checking merged video accessibility...")
+                        status_code, file_size = probe_size(merged_url)
+                    if status_code in PROBE_OK:
+                        file_size = file_size or 'Unknown'
                         print(f"✅ Merged video is accessible!")
                         print(f"📊 Server File Size: {file_size} bytes")
                         print(f"🌐 Download Command: curl -O '{merged_url}'")
                     else:
-                        print(f"❌ Merged video not accessible (status: {head_response.status_code})")
+                        print(f"❌ Merged video not accessible (status: {status_code})")
                 except Exception as e:
                     print(f"❌ Error checking merged video: {e}")
                 
@@ -117,7 +113,7 @@ def test_merged_video_search():
                     print(f"{i}. 📹 {timeline['video_title']}")
                     print(f"   Timeline: {timeline['overall_start_time_formatted']} - {timeline['overall_end_time_formatted']}")
                     if timeline.get('trimmed_video_url'):
-                        print(f"   Individual clip: {base_url}{timeline['trimmed_video_url']}")
+                        print(f"   Individual clip: {BASE_URL}{timeline['trimmed_video_url']}")
                     print()
             
             # Show individual scene results
@@ -153,17 +149,11 @@ def test_merged_video_search():
 
 def test_health_check():
     """Test if the API server is running"""
-    try:
-        response = requests.get("http://localhost:8000/health")
-        if response.status_code == 200:
-            print("✅ API server is running")
-            return True
-        else:
-            print("❌ API server returned error")
-            return False
-    except:
-        print("❌ API server is not running")
-        return False
+    if server_ok():
+        print("✅ API server is running")
+        return True
+    print("❌ API server is not running")
+    return False
 
 
 if __name__ == "__main__":
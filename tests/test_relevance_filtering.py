@@ -6,16 +6,20 @@ Test script to demonstrate the relevance filtering functionality
 import requests
 import json
 import sys
+import os
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import BASE_URL, CONNECT_TIMEOUT, PROBE_OK, SEARCH_URL, buffered_output, encode_payload, json_of, map_concurrently, post_json, probe_size, run_search, server_ok
 
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
+
+
+@buffered_output
 def test_relevance_filtering():
     """Test the enhanced search API with relevance filtering"""
     
-    # API endpoint
-    base_url = "http://localhost:8000"
-    search_endpoint = f"{base_url}/search"
-    
     # Test queries - one specific, one broad
     test_queries = [
         {
@@ -34,9 +38,21 @@ def test_relevance_filtering():
     
     print("🔍 Testing Relevance Filtering Functionality")
     print("=" * 60)
+    print("📡 Making search requests...")
     print()
     
-    for i, test_case in enumerate(test_queries, 1):
+    # Serialize every payload up front, then send them all at once and report in order
+    jobs = [
+        (test_case, encode_payload({
+            "query": test_case["query"],
+            "limit": 15,  # Get more initial results to test filtering
+            "min_score": 0.05  # Lower threshold to get more candidates
+        }))
+        for test_case in test_queries
+    ]
+    results = map_concurrently(_run_relevance_query, jobs)
+    
+    for i, (test_case, status_code, data, processing_time, error) in enumerate(results, 1):
         query = test_case["query"]
         description = test_case["description"]
         
@@ -44,75 +60,62 @@ def test_relevance_filtering():
         print(f"Query: '{query}'")
         print("-" * 40)
         
-        # Search request
-        search_request = {
-            "query": query,
-            "limit": 15,  # Get more initial results to test filtering
-            "min_score": 0.05  # Lower threshold to get more candidates
-        }
-        
-        try:
-            print("📡 Making search request...")
-            start_time = time.time()
+        if isinstance(error, requests.exceptions.Timeout):
+            print("⏰ Request timed out")
+            print()
             
-            response = requests.post(search_endpoint, json=search_request, timeout=180)
+        elif isinstance(error, requests.exceptions.ConnectionError):
+            print("❌ Connection Error: Could not connect to the API server")
+            print()
             
-            end_time = time.time()
-            processing_time = end_time - start_time
+        elif error is not None:
+            print(f"❌ Error: {str(error)}")
+            print()
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                print(f"✅ Request completed in {processing_time:.1f} seconds")
-                print(f"Query: {data['query']}")
+        elif status_code == 200:
+            print(f"✅ Request completed in {processing_time:.1f} seconds")
+            print(f"Query: {data['query']}")
+            
+            if data.get('merged_video_url'):
+                print(f"🎯 Merged Video Created: {data['merged_video_url']}")
                 
-                if data.get('merged_video_url'):
-                    print(f"🎯 Merged Video Created: {data['merged_video_url']}")
+                # Test video accessibility
+                video_url = f"{BASE_URL}{data['merged_video_url']}"
+                try:
+                    status_code, file_size = probe_size(video_url)
+                    if status_code in PROBE_OK:
+                        file_size = file_size or 'Unknown'
+                        print(f"✅ Video accessible, size: {file_size} bytes")
+                    else:
+                        print(f"❌ Video not accessible (status: {status_code})")
+                except Exception as e:
+                    print(f"❌ Error checking video: {e}")
                     
-                    # Test video accessibility
-                    video_url = f"{base_url}{data['merged_video_url']}"
-                    try:
-                        head_response = requests.head(video_url, timeout=10)
-                        if head_response.status_code == 200:
-                            file_size = head_response.headers.get('content-length', 'Unknown')
-                            print(f"✅ Video accessible, size: {file_size} bytes")
-                        else:
-                            print(f"❌ Video not accessible (status: {head_response.status_code})")
-                    except Exception as e:
-                        print(f"❌ Error checking video: {e}")
-                        
-                else:
-                    print("❌ No merged video created")
-                    print("This could mean:")
-                    print("• No scenes passed the relevance filtering")
-                    print("• No initial search results found")
-                    print("• Technical error in video processing")
-                
-                print()
-                
             else:
-                print(f"❌ Request failed with status code: {response.status_code}")
-                print(f"Response: {response.text}")
-                print()
-                
-        except requests.exceptions.Timeout:
-            print("⏰ Request timed out")
-            print()
+                print("❌ No merged video created")
+                print("This could mean:")
+                print("• No scenes passed the relevance filtering")
+                print("• No initial search results found")
+                print("• Technical error in video processing")
             
-        except requests.exceptions.ConnectionError:
-            print("❌ Connection Error: Could not connect to the API server")
             print()
             
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            print()
-        
-        if i < len(test_queries):
-            print("Waiting 2 seconds before next test...")
-            time.sleep(2)
+        else:
+            print(f"❌ Request failed with status code: {status_code}")
+            print(f"Response: {data}")
             print()
 
 
+def _run_relevance_query(job):
+    """Search for one (test_case, encoded payload) job, returning (test_case, status_code, data, processing_time, error)"""
+    test_case, payload = job
+    
+    start_time = time.time()
+    status_code, data, error = run_search(payload, read_timeout=180)
+    return test_case, status_code, data, time.time() - start_time, error
+
+
+@buffered_output
 def test_before_after_comparison():
     """Compare results with a specific query to show filtering impact"""
     
@@ -140,10 +143,10 @@ def test_before_after_comparison():
         print("• 'After relevance filtering: Y truly relevant scenes'")
         print()
         
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        response = post_json(SEARCH_URL, search_request, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             if data.get('merged_video_url'):
                 print(f"✅ Final result: Merged video created")
@@ -160,17 +163,11 @@ def test_before_after_comparison():
 
 def test_health_check():
     """Test if the API server is running"""
-    try:
-        response = requests.get("http://localhost:8000/health")
-        if response.status_code == 200:
-            print("✅ API server is running")
-            return True
-        else:
-            print("❌ API server returned error")
-            return False
-    except:
-        print("❌ API server is not running")
-        return False
+    if server_ok():
+        print("✅ API server is running")
+        return True
+    print("❌ API server is not running")
+    return False
 
 
 if __name__ == "__main__":
@@ -3,9 +3,15 @@
 Test script specifically for scenes 15-16 architecture issue
 """
 
-import requests
 import json
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import SEARCH_URL, SESSION, json_of, parse_merged_filename, server_ok
+
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
 
 
 def test_architecture_scenes_15_16():
@@ -42,34 +48,33 @@ def test_architecture_scenes_15_16():
             print("   • 'Consecutive architecture scenes: X → Y scenes'")
             print()
             
-            response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+            with SESSION.post(SEARCH_URL, json=search_request, timeout=180, stream=True) as response:
             
-            if response.status_code == 200:
-                data = response.json()
+                if response.status_code == 200:
+                    data = json_of(response)
                 
-                if data.get('merged_video_url'):
-                    filename = data['merged_video_url']
-                    print(f"✅ Video created: {filename}")
+                    if data.get('merged_video_url'):
+                        filename = data['merged_video_url']
+                        print(f"✅ Video created: {filename}")
                     
-                    # Parse segments count
-                    try:
-                        if 'segments' in filename:
-                            segments_part = filename.split('segments')[0].split('_')[-1]
-                            duration_part = filename.split('_')[-2]
-                            print(f"📊 {segments_part} segments, {duration_part} duration")
-                            
-                            if int(segments_part) >= 2:
+                        # Parse segments count
+                        parsed = parse_merged_filename(filename)
+                        if parsed:
+                            segments, duration = parsed
+                            print(f"📊 {segments} segments, {duration:.1f}s duration")
+                        
+                            if segments >= 2:
                                 print("✅ GOOD: Multiple segments suggest scenes 15-16 were likely included")
                             else:
                                 print("⚠️  ISSUE: Only 1 segment - scenes 15-16 may be missing")
-                    except:
-                        print("Could not parse filename details")
+                        else:
+                            print("Could not parse filename details")
                         
-                else:
-                    print("❌ No video created")
+                    else:
+                        print("❌ No video created")
                     
-            else:
-                print(f"❌ Request failed: {response.status_code}")
+                else:
+                    print(f"❌ Request failed: {response.status_code}")
                 
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -92,30 +97,31 @@ def test_with_high_limits():
         print("This should capture all scenes including 15-16")
         print()
         
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        with SESSION.post(SEARCH_URL, json=search_request, timeout=180, stream=True) as response:
         
-        if response.status_code == 200:
-            data = response.json()
+            if response.status_code == 200:
+                data = json_of(response)
             
-            if data.get('merged_video_url'):
-                filename = data['merged_video_url']
-                print(f"✅ High-limit test result: {filename}")
+                if data.get('merged_video_url'):
+                    filename = data['merged_video_url']
+                    print(f"✅ High-limit test result: {filename}")
                 
-                # Check if we got more segments
-                if 'segments' in filename:
-                    segments = filename.split('segments')[0].split('_')[-1]
-                    print(f"📊 With high limits: {segments} segments")
+                    # Check if we got more segments
+                    parsed = parse_merged_filename(filename)
+                    if parsed:
+                        segments, _ = parsed
+                        print(f"📊 With high limits: {segments} segments")
                     
-                    if int(segments) >= 3:
-                        print("✅ SUCCESS: High limits captured more content")
-                    else:
-                        print("⚠️  Still limited segments - deeper issue may exist")
+                        if segments >= 3:
+                            print("✅ SUCCESS: High limits captured more content")
+                        else:
+                            print("⚠️  Still limited segments - deeper issue may exist")
                         
-            else:
-                print("❌ High-limit test failed")
+                else:
+                    print("❌ High-limit test failed")
                 
-        else:
-            print(f"❌ High-limit test failed: {response.status_code}")
+            else:
+                print(f"❌ High-limit test failed: {response.status_code}")
             
     except Exception as e:
         print(f"❌ High-limit test error: {e}")
@@ -148,18 +154,18 @@ def debug_search_pipeline():
     }
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        with SESSION.post(SEARCH_URL, json=search_request, timeout=180, stream=True) as response:
         
-        if response.status_code == 200:
-            data = response.json()
-            print("✅ Pipeline completed")
+            if response.status_code == 200:
+                data = json_of(response)
+                print("✅ Pipeline completed")
             
-            if data.get('merged_video_url'):
-                print(f"Result: {data['merged_video_url']}")
+                if data.get('merged_video_url'):
+                    print(f"Result: {data['merged_video_url']}")
+                else:
+                    print("❌ No video produced")
             else:
-                print("❌ No video produced")
-        else:
-            print(f"❌ Pipeline failed: {response.status_code}")
+                print(f"❌ Pipeline failed: {response.status_code}")
             
     except Exception as e:
         print(f"❌ Pipeline error: {e}")
@@ -171,14 +177,9 @@ if __name__ == "__main__":
     print()
     
     # Check server
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running")
-        else:
-            print("❌ Server health check failed")
-            sys.exit(1)
-    except:
+    if server_ok():
+        print("✅ Server is running")
+    else:
         print("❌ Server is not running - start with: python start_server.py")
         sys.exit(1)
     
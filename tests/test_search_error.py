@@ -4,12 +4,36 @@ Simple test to identify search errors
 """
 
 import asyncio
+import atexit
+import functools
+import logging
 import sys
 import os
 
 # Add the current directory to path so we can import modules
 sys.path.append('.')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import buffered_output
 
+# Full tracebacks are only formatted when run with --verbose
+logger = logging.getLogger(__name__)
+
+# One event loop for every probe run in this process, so clients bound to it stay usable
+_LOOP = asyncio.new_event_loop()
+atexit.register(_LOOP.close)
+
+
+@functools.lru_cache(maxsize=1)
+def _components():
+    """Build the heavy search components once and share them across probes"""
+    from vector_store import VectorStore
+    from openai_analyzer import OpenAITimelineAnalyzer
+    from video_trimmer import VideoTrimmer
+    
+    return VectorStore(), OpenAITimelineAnalyzer(), VideoTrimmer()
+
+
+@buffered_output
 async def test_search_directly():
     """Test search functionality directly"""
     
@@ -17,19 +41,10 @@ async def test_search_directly():
     print("=" * 38)
     
     try:
-        # Import required modules
-        from vector_store import VectorStore
-        from openai_analyzer import OpenAITimelineAnalyzer
-        from video_trimmer import VideoTrimmer
-        
-        print("✅ Successfully imported required modules")
+        # Import and initialize components (similar to main.py), reusing them after the first probe
+        vector_store, openai_analyzer, video_trimmer = _components()
         
-        # Initialize components (similar to main.py)
-        vector_store = VectorStore()
-        openai_analyzer = OpenAITimelineAnalyzer()
-        video_trimmer = VideoTrimmer()
-        
-        print("✅ Successfully initialized components")
+        print("✅ Successfully imported and initialized components")
         
         # Test basic search
         query = "architecture"
@@ -72,8 +87,7 @@ async def test_search_directly():
         return False
     except Exception as e:
         print(f"❌ Error during search test: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Search probe failed", exc_info=True)
         return False
 
 
@@ -132,6 +146,8 @@ def check_environment():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG if "--verbose" in sys.argv else logging.WARNING)
+    
     print("🔍 Search Error Diagnosis")
     print("Identifying what's causing the search error")
     print()
@@ -146,7 +162,7 @@ if __name__ == "__main__":
     # Test search directly
     print("\n" + "="*50)
     try:
-        success = asyncio.run(test_search_directly())
+        success = _LOOP.run_until_complete(test_search_directly())
         
         if success:
             print("\n✅ Direct search test passed")
@@ -157,8 +173,7 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"\n❌ Failed to run direct test: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Direct search test crashed", exc_info=True)
     
     print()
     print("🔧 Next Steps:")
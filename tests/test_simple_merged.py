@@ -6,15 +6,18 @@ Simple test script for the merged video functionality
 import requests
 import json
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import BASE_URL, CONNECT_TIMEOUT, PROBE_OK, SEARCH_URL, json_of, post_json, probe_size, server_ok, text_of
+
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
 
 
 def test_simple_merged_video():
     """Test the simplified merged video search API"""
     
-    # API endpoint
-    base_url = "http://localhost:8000"
-    search_endpoint = f"{base_url}/search"
-    
     # Test search request
     search_request = {
         "query": "neural networks",
@@ -30,10 +33,10 @@ def test_simple_merged_video():
     try:
         # Make the search request
         print("📡 Making API request...")
-        response = requests.post(search_endpoint, json=search_request, timeout=180)
+        response = post_json(SEARCH_URL, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             print("✅ Request successful!")
             print()
@@ -42,18 +45,18 @@ def test_simple_merged_video():
             
             if data.get('merged_video_url'):
                 print(f"🎯 Merged Video URL: {data['merged_video_url']}")
-                print(f"🌐 Full Download URL: {base_url}{data['merged_video_url']}")
+                print(f"🌐 Full Download URL: {BASE_URL}{data['merged_video_url']}")
                 
                 # Test if the video is accessible
-                video_url = f"{base_url}{data['merged_video_url']}"
+                video_url = f"{BASE_URL}{data['merged_video_url']}"
                 try:
-                    head_response = requests.head(video_url, timeout=10)
-                    if head_response.status_code == 200:
-                        file_size = head_response.headers.get('content-length', 'Unknown')
+                    status_code, file_size = probe_size(video_url)
+                    if status_code in PROBE_OK:
+                        file_size = file_size or 'Unknown'
                         print(f"✅ Video is accessible and ready for download")
                         print(f"📊 File size: {file_size} bytes")
                     else:
-                        print(f"❌ Video not accessible (status: {head_response.status_code})")
+                        print(f"❌ Video not accessible (status: {status_code})")
                 except Exception as e:
                     print(f"❌ Error checking video: {e}")
                 
@@ -64,11 +67,11 @@ def test_simple_merged_video():
             print()
             print("💡 How to download:")
             if data.get('merged_video_url'):
-                print(f"curl -O '{base_url}{data['merged_video_url']}'")
+                print(f"curl -O '{BASE_URL}{data['merged_video_url']}'")
             
         else:
             print(f"❌ Request failed with status code: {response.status_code}")
-            print(f"Response: {response.text}")
+            print(f"Response: {text_of(response)}")
             
     except requests.exceptions.Timeout:
         print("⏰ Request timed out")
@@ -82,17 +85,11 @@ def test_simple_merged_video():
 
 def test_health_check():
     """Test if the API server is running"""
-    try:
-        response = requests.get("http://localhost:8000/health")
-        if response.status_code == 200:
-            print("✅ API server is running")
-            return True
-        else:
-            print("❌ API server returned error")
-            return False
-    except:
-        print("❌ API server is not running")
-        return False
+    if server_ok():
+        print("✅ API server is running")
+        return True
+    print("❌ API server is not running")
+    return False
 
 
 if __name__ == "__main__":
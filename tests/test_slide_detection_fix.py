@@ -7,6 +7,8 @@ import asyncio
 import sys
 import os
 
+import numpy as np
+
 
 async def test_improved_slide_detection():
     """Test the improved slide detection on a video file"""
@@ -16,7 +18,7 @@ async def test_improved_slide_detection():
     
     # Import the video processor
     try:
-        from video_processor import VideoProcessor
+        from video_processor import get_video_processor
     except ImportError as e:
         print(f"❌ Import error: {e}")
         return
@@ -33,12 +35,11 @@ async def test_improved_slide_detection():
     # Check uploads
     uploads_dir = "uploads"
     if os.path.exists(uploads_dir):
-        for item in os.listdir(uploads_dir):
-            item_path = os.path.join(uploads_dir, item)
-            if os.path.isdir(item_path):
-                for file in os.listdir(item_path):
-                    if file.endswith('.mp4'):
-                        video_files.append(os.path.join(item_path, file))
+        with os.scandir(uploads_dir) as items:
+            for item in items:
+                if item.is_dir():
+                    with os.scandir(item.path) as files:
+                        video_files.extend(f.path for f in files if f.name.endswith('.mp4'))
     
     if not video_files:
         print("❌ No video files found")
@@ -48,7 +49,7 @@ async def test_improved_slide_detection():
     print(f"📹 Using video: {video_path}")
     
     # Create video processor
-    processor = VideoProcessor()
+    processor = get_video_processor()
     
     # Test the slide detection
     try:
@@ -57,7 +58,9 @@ async def test_improved_slide_detection():
         os.makedirs(output_dir, exist_ok=True)
         
         # Call the detection method directly
-        slide_changes = processor._detect_slide_transitions(video_path, output_dir, threshold=8)
+        slide_changes = processor._detect_slide_transitions(
+            video_path, output_dir, threshold=8, workers=os.cpu_count() or 1
+        )
         
         print(f"\n📊 Results:")
         print(f"   Detected {len(slide_changes)} scene transitions")
@@ -83,11 +86,15 @@ async def test_improved_slide_detection():
         
         scene_list = processor._generate_scene_list_from_slides(slide_changes, video_duration)
         
+        # Split all boundaries into minutes/seconds in one vectorized pass
+        bounds = np.array(scene_list, dtype=float).reshape(-1, 2)
+        minutes, seconds = np.divmod(bounds.astype(int), 60)
+        
         print(f"\n📋 Generated Scene Boundaries:")
         for i, (start, end) in enumerate(scene_list):
             duration = end - start
-            start_time = f"{int(start//60)}:{int(start%60):02d}"
-            end_time = f"{int(end//60)}:{int(end%60):02d}"
+            start_time = f"{minutes[i, 0]}:{seconds[i, 0]:02d}"
+            end_time = f"{minutes[i, 1]}:{seconds[i, 1]:02d}"
             
             highlight = "🎯" if i+1 == 16 else "  "
             print(f"{highlight} Scene {i+1:2d}: {start_time} - {end_time} ({duration:5.1f}s)")
@@ -109,6 +116,12 @@ async def test_improved_slide_detection():
         traceback.print_exc()
 
 
+def _count_jpgs(directory):
+    """Count .jpg files in a directory in a single scandir pass"""
+    with os.scandir(directory) as entries:
+        return sum(1 for entry in entries if entry.is_file() and entry.name.endswith('.jpg'))
+
+
 def compare_with_existing():
     """Compare with existing scene images"""
     
@@ -119,15 +132,15 @@ def compare_with_existing():
     new_dir = "scene_images_test"
     
     if os.path.exists(existing_dir) and os.path.exists(new_dir):
-        existing_files = [f for f in os.listdir(existing_dir) if f.endswith('.jpg')]
-        new_files = [f for f in os.listdir(new_dir) if f.endswith('.jpg')]
+        existing_count = _count_jpgs(existing_dir)
+        new_count = _count_jpgs(new_dir)
         
-        print(f"Existing scenes: {len(existing_files)}")
-        print(f"New detection: {len(new_files)}")
+        print(f"Existing scenes: {existing_count}")
+        print(f"New detection: {new_count}")
         
-        if len(new_files) < len(existing_files):
+        if new_count < existing_count:
             print("✅ Good: Fewer scenes detected (likely merged short scenes)")
-        elif len(new_files) == len(existing_files):
+        elif new_count == existing_count:
             print("➖ Same: Same number of scenes")
         else:
             print("⚠️  More: More scenes detected")
@@ -3,9 +3,36 @@
 Test script to verify strict relevance filtering is working
 """
 
-import requests
 import json
 import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import CONNECT_TIMEOUT, SEARCH_URL, encode_payload, json_of, map_concurrently, parse_merged_filename, post_json, run_search, server_ok, text_of
+
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
+
+QUERY_CASES = [
+    {
+        "query": "architecture diagram",
+        "expected": "Should be very focused - 1 segment, 30-90s"
+    },
+    {
+        "query": "AWS services in the application",
+        "expected": "Should focus on specific AWS content only"
+    },
+    {
+        "query": "deployment process",
+        "expected": "Should exclude architecture unless it's about deployment architecture"
+    }
+]
+
+# Request bodies are identical on every run, so serialize them once at import
+_PAYLOADS = {
+    case["query"]: encode_payload({"query": case["query"], "limit": 20, "min_score": 0.15})
+    for case in QUERY_CASES
+}
 
 
 def test_architecture_query_strict():
@@ -31,29 +58,17 @@ def test_architecture_query_strict():
     print()
     
     try:
-        response = requests.post("http://localhost:8000/search", json=search_request, timeout=180)
+        response = post_json(SEARCH_URL, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             if data.get('merged_video_url'):
                 filename = data['merged_video_url']
                 print(f"✅ Video created: {filename}")
                 
                 # Parse metadata
-                segments = 0
-                duration = 0
-                
-                if 'segments' in filename:
-                    parts = filename.split('_')
-                    for i, part in enumerate(parts):
-                        if 'segments' in part:
-                            segments = int(part.replace('segments', ''))
-                        if part.endswith('s') and '.' in part:
-                            try:
-                                duration = float(part[:-1])
-                            except:
-                                pass
+                segments, duration = parse_merged_filename(filename) or (0, 0.0)
                 
                 print(f"📊 Result: {segments} segments, {duration:.1f}s")
                 
@@ -103,7 +118,7 @@ def test_architecture_query_strict():
                 
         else:
             print(f"❌ Search failed: {response.status_code}")
-            print(response.text)
+            print(text_of(response))
             
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -115,73 +130,45 @@ def test_different_query_types():
     print("\n🔍 Testing Different Query Types")
     print("=" * 30)
     
-    test_queries = [
-        {
-            "query": "architecture diagram",
-            "expected": "Should be very focused - 1 segment, 30-90s"
-        },
-        {
-            "query": "AWS services in the application",
-            "expected": "Should focus on specific AWS content only"
-        },
-        {
-            "query": "deployment process",
-            "expected": "Should exclude architecture unless it's about deployment architecture"
-        }
-    ]
+    # Send every query at once; the server-side work overlaps and results are reported in order
+    results = map_concurrently(run_search, [_PAYLOADS[test_case["query"]] for test_case in QUERY_CASES])
+    for test_case, result in zip(QUERY_CASES, results):
+        _report_query_type(test_case, *result)
+
+
+# pytest runs each case separately through test_query_type instead, so xdist can spread them over workers
+test_different_query_types.__test__ = False
+
+
+def test_query_type(query_case):
+    """Test one query type (parametrized over QUERY_CASES by tests/conftest.py)"""
+    _report_query_type(query_case, *run_search(_PAYLOADS[query_case["query"]]))
+
+
+def _report_query_type(test_case, status_code, data, error):
+    """Print how focused the merged video for one query type is"""
+    print(f"\n📝 Query: '{test_case['query']}'")
+    print(f"Expected: {test_case['expected']}")
     
-    for test_case in test_queries:
-        query = test_case["query"]
-        expected = test_case["expected"]
-        
-        print(f"\n📝 Query: '{query}'")
-        print(f"Expected: {expected}")
+    if error is not None:
+        print(f"❌ Error: {error}")
+    elif status_code != 200:
+        print(f"❌ Failed: {status_code}")
+    elif data.get('merged_video_url'):
+        filename = data['merged_video_url']
         
-        search_request = {
-            "query": query,
-            "limit": 20,
-            "min_score": 0.15
-        }
+        # Quick analysis
+        segments, duration = parse_merged_filename(filename) or (0, 0.0)
         
-        try:
-            response = requests.post("http://localhost:8000/search", json=search_request, timeout=120)
+        if segments <= 2 and duration < 120:
+            print(f"✅ Focused: {segments} segments, {duration:.1f}s")
+        elif segments <= 3 and duration < 180:
+            print(f"⚠️  Moderate: {segments} segments, {duration:.1f}s")
+        else:
+            print(f"❌ Too broad: {segments} segments, {duration:.1f}s")
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('merged_video_url'):
-                    filename = data['merged_video_url']
-                    
-                    # Quick analysis
-                    segments = 0
-                    duration = 0
-                    if 'segments' in filename:
-                        parts = filename.split('_')
-                        for part in parts:
-                            if 'segments' in part:
-                                segments = int(part.replace('segments', ''))
-                            if part.endswith('s') and '.' in part:
-                                try:
-                                    duration = float(part[:-1])
-                                    break
-                                except:
-                                    pass
-                    
-                    if segments <= 2 and duration < 120:
-                        print(f"✅ Focused: {segments} segments, {duration:.1f}s")
-                    elif segments <= 3 and duration < 180:
-                        print(f"⚠️  Moderate: {segments} segments, {duration:.1f}s")
-                    else:
-                        print(f"❌ Too broad: {segments} segments, {duration:.1f}s")
-                        
-                else:
-                    print("❌ No video")
-                    
-            else:
-                print(f"❌ Failed: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    else:
+        print("❌ No video")
 
 
 def check_strict_filtering_indicators():
@@ -219,14 +206,9 @@ if __name__ == "__main__":
     print()
     
     # Check server
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running")
-        else:
-            print("❌ Server health check failed")
-            sys.exit(1)
-    except:
+    if server_ok():
+        print("✅ Server is running")
+    else:
         print("❌ Server not running - start with: python start_server.py")
         sys.exit(1)
     
@@ -6,6 +6,7 @@ Test script to demonstrate the enhanced search functionality with OpenAI timelin
 import asyncio
 import json
 import os
+import statistics
 from openai_analyzer import OpenAITimelineAnalyzer
 from models import SearchResult
 
@@ -58,6 +59,21 @@ example_search_results = [
     )
 ]
 
+# Low-relevance scenes are dropped before they reach OpenAI
+MIN_SIMILARITY_SCORE = 0.5
+OUTLIER_STDDEVS = 1.5
+
+
+def prefilter_by_score(results):
+    """Keep results above the minimum score that are not low-score outliers"""
+    scores = [result.similarity_score for result in results]
+    if not scores:
+        return results
+    
+    cutoff = max(MIN_SIMILARITY_SCORE, statistics.fmean(scores) - OUTLIER_STDDEVS * statistics.pstdev(scores))
+    return [result for result in results if result.similarity_score >= cutoff]
+
+
 async def test_timeline_analysis():
     """Test the OpenAI timeline analysis functionality"""
     
@@ -90,9 +106,13 @@ async def test_timeline_analysis():
         print()
     
     try:
+        # Drop low-relevance results before the OpenAI call
+        filtered_results = prefilter_by_score(example_search_results)
+        print(f"🔎 Prefilter kept {len(filtered_results)}/{len(example_search_results)} results")
+        
         # Analyze the search results to get video timelines
         print("🤖 Running OpenAI Analysis...")
-        video_timelines = await analyzer.analyze_search_results(query, example_search_results)
+        video_timelines = await analyzer.analyze_search_results(query, filtered_results)
         
         print(f"✅ Analysis Complete! Found {len(video_timelines)} video(s) with relevant content")
         print()
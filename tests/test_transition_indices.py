@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Check the vectorized transition scan against the per-frame _is_transition rule
+"""
+
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.video_processor import _is_transition, _transition_indices
+
+THRESHOLD = 6
+
+
+def _hashes_from_distances(distances):
+    """Build 64-bit hashes whose consecutive Hamming distances are exactly the given values"""
+    hashes = [0x0123456789ABCDEF]
+    for i, distance in enumerate(distances):
+        mask = ((1 << distance) - 1) << (i * 5 % 50)
+        hashes.append(hashes[-1] ^ mask)
+    return hashes
+
+
+def _expected(hashes, threshold):
+    return [i for i in range(1, len(hashes)) if _is_transition(hashes, i, threshold)]
+
+
+def test_transition_indices_matches_is_transition():
+    """Exact-threshold distances, back-to-back changes and the first/last frames"""
+    # Distance into frames 1..11: a change at the first frame, one exactly at the threshold,
+    # a sustained change followed by a noisy one, a change after an exact-threshold step, and one at the last frame
+    hashes = _hashes_from_distances([7, 0, 6, 0, 7, 7, 0, 6, 7, 3, 7])
+
+    assert _expected(hashes, THRESHOLD) == [1, 5, 9, 11]
+    assert _transition_indices(hashes, THRESHOLD) == _expected(hashes, THRESHOLD)
+
+
+def test_transition_indices_random_sequences():
+    """Random distances clustered around the threshold"""
+    rng = random.Random(0)
+    for length in (2, 3, 4, 50, 500):
+        hashes = _hashes_from_distances([rng.randint(THRESHOLD - 2, THRESHOLD + 2) for _ in range(length - 1)])
+        assert _transition_indices(hashes, THRESHOLD) == _expected(hashes, THRESHOLD)
+
+
+if __name__ == "__main__":
+    print("🔍 Checking _transition_indices against _is_transition")
+    test_transition_indices_matches_is_transition()
+    test_transition_indices_random_sequences()
+    print("✅ Vectorized transition scan matches the per-frame rule")
@@ -7,24 +7,28 @@ import requests
 import json
 import sys
 import os
-import subprocess
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._common import BASE_URL, CONNECT_TIMEOUT, PROBE_OK, SEARCH_URL, SESSION, buffered_output, check_ffmpeg, json_of, map_concurrently, post_json, probe_size, run_concurrently, server_ok, text_of
 
-def check_ffmpeg():
-    """Check if ffmpeg is installed"""
+# Hits the running API server; tests/conftest.py skips this module when it is down
+REQUIRES_SERVER = True
+
+
+def _probe_or_error(url):
+    """Probe a URL's size, returning the exception instead of raising so batch checks can report it"""
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        return probe_size(url)
+    except requests.exceptions.RequestException as e:
+        return e
 
 
+@buffered_output
 def test_search_with_video_trimming():
     """Test the enhanced search API with automatic video trimming"""
     
     # API endpoint
-    base_url = "http://localhost:8000"
-    search_endpoint = f"{base_url}/search"
+    search_endpoint = SEARCH_URL
     
     # Test search request
     search_request = {
@@ -42,10 +46,10 @@ def test_search_with_video_trimming():
     try:
         # Make the search request
         print("📡 Making API request...")
-        response = requests.post(search_endpoint, json=search_request)
+        response = post_json(search_endpoint, search_request, stream=True, timeout=(CONNECT_TIMEOUT, 180))
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_of(response)
             
             print("✅ Request successful!")
             print()
@@ -57,6 +61,14 @@ def test_search_with_video_trimming():
             
             # Display video timelines with trimmed videos
             if data['video_timelines']:
+                # Collect the trimmed videos once; this drives the size probes, the report and the curl lines
+                trimmed_urls = {
+                    i: f"{BASE_URL}{timeline['trimmed_video_url']}"
+                    for i, timeline in enumerate(data['video_timelines'], 1)
+                    if timeline.get('trimmed_video_url')
+                }
+                probe_results = dict(zip(trimmed_urls, map_concurrently(_probe_or_error, trimmed_urls.values())))
+                
                 print("🎯 Video Timelines with Trimmed Videos:")
                 print("-" * 50)
                 for i, timeline in enumerate(data['video_timelines'], 1):
@@ -67,35 +79,33 @@ def test_search_with_video_trimming():
                     print(f"   🧠 AI Reasoning: {timeline['relevance_reasoning']}")
                     
                     # Check if trimmed video was generated
-                    if timeline.get('trimmed_video_url'):
+                    if i in trimmed_urls:
                         print(f"   ✅ Trimmed Video: {timeline['trimmed_video_url']}")
                         print(f"   📁 Local Path: {timeline.get('trimmed_video_path', 'N/A')}")
                         
                         # Test downloading the trimmed video
-                        trimmed_url = f"{base_url}{timeline['trimmed_video_url']}"
-                        try:
-                            head_response = requests.head(trimmed_url)
-                            if head_response.status_code == 200:
-                                file_size = head_response.headers.get('content-length', 'Unknown')
-                                print(f"   📊 File Size: {file_size} bytes")
+                        trimmed_url = trimmed_urls[i]
+                        probe = probe_results[i]
+                        if isinstance(probe, Exception):
+                            print(f"   ❌ Error checking trimmed video: {probe}")
+                        else:
+                            status_code, file_size = probe
+                            if status_code in PROBE_OK:
+                                print(f"   📊 File Size: {file_size or 'Unknown'} bytes")
                                 print(f"   🌐 Download URL: {trimmed_url}")
                             else:
-                                print(f"   ❌ Trimmed video not accessible (status: {head_response.status_code})")
-                        except Exception as e:
-                            print(f"   ❌ Error checking trimmed video: {e}")
+                                print(f"   ❌ Trimmed video not accessible (status: {status_code})")
                     else:
                         print(f"   ❌ No trimmed video generated (likely ffmpeg not available)")
                     
                     print()
                     
                 # Show download instructions
-                if any(t.get('trimmed_video_url') for t in data['video_timelines']):
+                if trimmed_urls:
                     print("💾 Download Instructions:")
                     print("You can download the trimmed videos using:")
-                    for i, timeline in enumerate(data['video_timelines'], 1):
-                        if timeline.get('trimmed_video_url'):
-                            download_url = f"{base_url}{timeline['trimmed_video_url']}"
-                            print(f"{i}. curl -O {download_url}")
+                    for i, download_url in trimmed_urls.items():
+                        print(f"{i}. curl -O {download_url}")
                     print()
                     
             else:
@@ -103,7 +113,7 @@ def test_search_with_video_trimming():
                 
         else:
             print(f"❌ Request failed with status code: {response.status_code}")
-            print(f"Response: {response.text}")
+            print(f"Response: {text_of(response)}")
             
     except requests.exceptions.ConnectionError:
         print("❌ Connection Error: Could not connect to the API server")
@@ -113,6 +123,7 @@ def test_search_with_video_trimming():
         print(f"❌ Error: {str(e)}")
 
 
+@buffered_output
 def test_manual_video_trimming():
     """Test manual video trimming endpoint"""
     
@@ -122,7 +133,7 @@ def test_manual_video_trimming():
     
     # First, get list of available videos
     try:
-        response = requests.get("http://localhost:8000/videos")
+        response = SESSION.get(f"{BASE_URL}/videos")
         if response.status_code == 200:
             videos = response.json()['videos']
             if not videos:
@@ -143,7 +154,7 @@ def test_manual_video_trimming():
             
             print(f"Trimming from {trim_request['start_time']}s to {trim_request['end_time']}s...")
             
-            response = requests.post("http://localhost:8000/trim_video", params=trim_request)
+            response = SESSION.post(f"{BASE_URL}/trim_video", params=trim_request)
             
             if response.status_code == 200:
                 trim_info = response.json()
@@ -151,7 +162,7 @@ def test_manual_video_trimming():
                 print(f"Trimmed file: {trim_info['trimmed_filename']}")
                 print(f"File size: {trim_info['file_size_mb']} MB")
                 print(f"Duration: {trim_info['duration_seconds']} seconds")
-                print(f"Download URL: http://localhost:8000{trim_info['trimmed_url']}")
+                print(f"Download URL: {BASE_URL}{trim_info['trimmed_url']}")
             else:
                 print(f"❌ Manual trimming failed: {response.text}")
                 
@@ -164,17 +175,11 @@ def test_manual_video_trimming():
 
 def test_health_check():
     """Test if the API server is running"""
-    try:
-        response = requests.get("http://localhost:8000/health")
-        if response.status_code == 200:
-            print("✅ API server is running")
-            return True
-        else:
-            print("❌ API server returned error")
-            return False
-    except:
-        print("❌ API server is not running")
-        return False
+    if server_ok():
+        print("✅ API server is running")
+        return True
+    print("❌ API server is not running")
+    return False
 
 
 if __name__ == "__main__":
@@ -205,9 +210,8 @@ if __name__ == "__main__":
     
     print()
     
-    # Run the tests
-    test_search_with_video_trimming()
-    test_manual_video_trimming()
+    # Run the tests (independent, so run them side by side)
+    run_concurrently(test_search_with_video_trimming, test_manual_video_trimming)
     
     print()
     print("🎉 Test complete!")
@@ -220,4 +224,4 @@ if __name__ == "__main__":
     print("• Files are served via static file serving")
     print()
     print("📁 Trimmed videos are saved in: ./trimmed_videos/")
-    print("🌐 Access them via: http://localhost:8000/trimmed_videos/filename.mp4")
\ No newline at end of file
+    print(f"🌐 Access them via: {BASE_URL}/trimmed_videos/filename.mp4")
\ No newline at end of file